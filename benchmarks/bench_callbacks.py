@@ -0,0 +1,153 @@
+# bench_callbacks.py
+#
+# Benchmarks the dashboard callback functions on synthetic corpora at 1x, 10x, 100x
+# and 1000x the size of the bundled data (see synthetic_corpus.py). The ingredient
+# vocabulary grows with the square root of the number of recipes.
+#
+# For each scale and filter scenario, every function is called directly (outside of a
+# request) and reports its median latency, the peak memory it allocates (tracemalloc)
+# and the size of its JSON response payload, as Dash would serialize it. The filter
+# stages feeding the charts (filter_recipes, filter_recipe_table) are timed on their
+# own, with their caches cleared before every call.
+#
+# Usage from the project root:
+# python -m benchmarks.bench_callbacks --scales 1 10 100 1000 --repeat 5
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from contextvars import copy_context
+
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+from plotly.io.json import to_json_plotly
+
+from benchmarks.synthetic_corpus import BASE_INGREDIENTS, BASE_RECIPES, generate_corpus, write_corpus
+from src import callbacks, dataset
+from src.filters import canonical_filters
+
+
+def with_trigger(prop_id, fn, *args):
+    """
+    Calls `fn` inside a callback context triggered by `prop_id`, like a Dash request would.
+    """
+    def run():
+        context_value.set(AttributeDict(triggered_inputs=[{"prop_id": prop_id, "value": None}]))
+        return fn(*args)
+    return copy_context().run(run)
+
+
+def clear_caches():
+    """
+    Clears the in-process caches of the callbacks, so that every call is a cold one.
+    """
+    for cached in [callbacks.ingredient_option, callbacks.subcategory_options,
+                   callbacks.filter_recipes, callbacks.filter_recipe_table]:
+        cached.cache_clear()
+
+
+def no_setup():
+    pass
+
+
+def measure(fn, repeat, setup=clear_caches, payload=True):
+    """
+    Returns (median seconds, peak allocated bytes, payload bytes) of `fn()`, calling
+    `setup()` before each call. The payload is None for functions that are not callback outputs.
+    """
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(times), peak, len(to_json_plotly(result).encode()) if payload else None
+
+
+def scenarios(data):
+    """
+    The filter inputs benchmarked: no filter, then a narrower rating range with the three
+    most popular ingredients, in "any" and in "all" mode.
+    """
+    top = list(data.ingredients_by_popularity()[:3])
+    return {
+        "all recipes": canonical_filters([0, 1], [], "any"),
+        "top-3 any": canonical_filters([0.5, 1], top, "any"),
+        "top-3 all": canonical_filters([0.5, 1], top, "all"),
+    }
+
+
+def bench_scale(scale, repeat, zipf, seed):
+    n_recipes = BASE_RECIPES * scale
+    n_ingredients = round(BASE_INGREDIENTS * scale ** 0.5)
+
+    with tempfile.TemporaryDirectory(prefix="cookie-bench-") as out_dir:
+        processed = generate_corpus(n_recipes, n_ingredients, zipf=zipf, seed=seed)
+        paths = write_corpus(processed, out_dir)
+
+        # the memory-mapped Arrow copy goes next to the corpus, not over the app's own copy
+        # (the mapping outlives the directory)
+        start = time.perf_counter()
+        data = dataset.load_dataset(**paths, arrow_path=os.path.join(out_dir, "processed_cookie_data.arrow"))
+        load_time = time.perf_counter() - start
+
+    # every callback reads the data through get_dataset()
+    dataset._dataset = data
+    clear_caches()
+
+    print(f"\n{scale}x: {len(processed)} rows, {n_recipes} recipes, "
+          f"{data.recipes['Ingredient'].nunique()} ingredients (loaded in {load_time:.2f} s)")
+    print(f"{'scenario':<12} {'function':<32} {'latency (ms)':>13} {'peak memory (KiB)':>18} {'payload (KiB)':>14}")
+
+    def report(name, fn_name, stats):
+        latency, peak, payload = stats
+        payload = f"{payload / 1024:14.1f}" if payload is not None else f"{'-':>14}"
+        print(f"{name:<12} {fn_name:<32} {latency * 1000:13.2f} {peak / 1024:18.1f} {payload}")
+
+    report("-", "update_ingredient_checklist", measure(
+        lambda: with_trigger("selected-subcategory.data", callbacks.update_ingredient_checklist, None, None, []),
+        repeat
+    ))
+
+    for name, key in scenarios(data).items():
+        report(name, "filter_recipes", measure(lambda: callbacks.filter_recipes(*key), repeat, payload=False))
+        report(name, "filter_recipe_table",
+               measure(lambda: callbacks.filter_recipe_table(*key), repeat, payload=False))
+
+        result = callbacks.filter_recipes(*key)
+        recipes = callbacks.filter_recipe_table(*key)
+        report(name, "create_ratings_distribution",
+               measure(lambda: callbacks.create_ratings_distribution(result), repeat, no_setup))
+        report(name, "update_gauge_chart",
+               measure(lambda: callbacks.update_gauge_chart(result), repeat, no_setup))
+        report(name, "create_ingredient_distribution",
+               measure(lambda: callbacks.create_ingredient_distribution(result), repeat, no_setup))
+        report(name, "update_recipe_list",
+               measure(lambda: callbacks.update_recipe_list(recipes, 1), repeat, no_setup))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard callbacks on synthetic corpora.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="corpus sizes, as multiples of the bundled data")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per function")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of ingredient popularity")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        bench_scale(scale, args.repeat, args.zipf, args.seed)
+
+
+if __name__ == "__main__":
+    main()
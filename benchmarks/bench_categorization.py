@@ -0,0 +1,94 @@
+# bench_categorization.py
+#
+# Benchmarks the ingredient categorization stage of the processing pipeline:
+# the vectorized rule table (engineer_categories_and_subcategories) against the
+# previous per-row implementation (Python loops + Series.apply), on raw inputs
+# built by resampling the rows of data/raw/raw_cookie_data.csv.
+# Both implementations are checked to give the same categories.
+#
+# Usage from the project root:
+# python -m benchmarks.bench_categorization --rows 10000 100000 1000000 5000000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_reading_and_processing import (
+    categorize_subcategory,
+    engineer_categories_and_subcategories,
+    sub_categorize_ingredient,
+)
+
+
+def per_row_categories(raw_data):
+    """
+    The previous implementation: ingredient lists built with Python loops, then
+    one `sub_categorize_ingredient` and one `categorize_subcategory` call per row.
+    """
+    unique_ingredients = raw_data["Ingredient"].unique()
+    flour_types = [i for i in unique_ingredients if "flour" in i]
+    sugar_types = [i for i in unique_ingredients if "sugar" in i]
+    sweetener_types = sugar_types + ["corn syrup", "honey", "molasses", "applesauce"]
+    fat_types = ["butter", "margarine", "shortening", "vegetable oil"]
+    chocolate_types = [i for i in unique_ingredients if "chocolate" in i]
+
+    data = raw_data.copy()
+    data["subcategory"] = data["Ingredient"].apply(
+        sub_categorize_ingredient,
+        args=(flour_types, sweetener_types, fat_types, chocolate_types)
+    )
+    data["category"] = data["subcategory"].apply(categorize_subcategory)
+    return data
+
+
+def synthetic_raw_data(n_rows, seed=0):
+    """
+    Resamples the raw rows to `n_rows` rows, giving some ingredients a numbered variant
+    so that the number of distinct ingredients also grows with the input.
+    """
+    raw = pd.read_csv("data/raw/raw_cookie_data.csv", index_col=0)
+    rng = np.random.default_rng(seed)
+    sample = raw.iloc[rng.integers(0, len(raw), n_rows)].reset_index(drop=True)
+    variant = rng.integers(0, max(n_rows // 1000, 1), n_rows)
+    sample["Ingredient"] = np.where(
+        variant % 2 == 0,
+        sample["Ingredient"],
+        sample["Ingredient"] + " " + variant.astype(str)
+    )
+    return sample
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingredient categorization stage.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000],
+                        help="raw input sizes to benchmark")
+    parser.add_argument("--per-row-max-rows", type=int, default=1_000_000,
+                        help="skip the per-row implementation above this size")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'ingredients':>12} {'vectorized (s)':>15} {'per-row (s)':>12} {'speedup':>8}")
+    for n_rows in args.rows:
+        raw = synthetic_raw_data(n_rows)
+        vectorized, vectorized_time = timed(engineer_categories_and_subcategories, raw)
+
+        if n_rows <= args.per_row_max_rows:
+            per_row, per_row_time = timed(per_row_categories, raw)
+            assert vectorized["subcategory"].equals(per_row["subcategory"])
+            assert vectorized["category"].equals(per_row["category"])
+            per_row_text, speedup_text = f"{per_row_time:12.3f}", f"{per_row_time / vectorized_time:7.1f}x"
+        else:
+            per_row_text, speedup_text = f"{'skipped':>12}", f"{'':>8}"
+
+        print(f"{n_rows:>10} {raw['Ingredient'].nunique():>12} {vectorized_time:15.3f} {per_row_text} {speedup_text}")
+
+
+if __name__ == "__main__":
+    main()
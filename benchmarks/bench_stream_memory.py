@@ -0,0 +1,87 @@
+# bench_stream_memory.py
+#
+# Checks that the streaming ingest (process_stream) runs in bounded memory: raw csvs
+# of growing size (see synthetic_corpus.py) are processed with the same bucket size
+# and chunk size, each in a fresh interpreter, and the peak resident memory of each run
+# is reported. The peak should stay roughly flat as the input grows; the benchmark
+# exits with status 1 if the peak of the largest input exceeds --max-growth times the
+# peak of the smallest one, so it can run in CI.
+#
+# Each run writes its outputs under a temporary directory (the script's relative
+# data/processed/ paths), never over the real processed data.
+#
+# Usage from the project root:
+# python -m benchmarks.bench_stream_memory --scales 10 100 1000 --bucket-mib 4
+
+import argparse
+import math
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic_corpus import BASE_INGREDIENTS, BASE_RECIPES, generate_raw
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+# run in the child interpreter: process the raw csv, print the peak RSS (KiB on Linux, bytes on macOS)
+CHILD = """
+import resource, sys
+sys.path.insert(0, {src!r})
+import data_reading_and_processing as processing
+rows = processing.process_stream({raw!r}, chunksize={chunksize}, n_buckets={n_buckets})
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(rows, peak if sys.platform != "darwin" else peak // 1024)
+"""
+
+
+def run_stream(raw_path: str, work_dir: str, chunksize: int, bucket_bytes: int) -> tuple:
+    """
+    Runs process_stream on `raw_path` in a fresh interpreter, with `work_dir` as the working
+    directory. Returns (processed rows, peak resident memory in MiB).
+    """
+    os.makedirs(os.path.join(work_dir, "data", "processed"), exist_ok=True)
+    n_buckets = max(1, math.ceil(os.path.getsize(raw_path) / bucket_bytes))
+    child = CHILD.format(src=SRC_DIR, raw=raw_path, chunksize=chunksize, n_buckets=n_buckets)
+    completed = subprocess.run([sys.executable, "-c", child], cwd=work_dir,
+                               capture_output=True, text=True, check=True)
+    rows, peak_kib = completed.stdout.split()[-2:]
+    return int(rows), int(peak_kib) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the streaming ingest runs in bounded memory.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000],
+                        help="raw input sizes, as multiples of the bundled data")
+    parser.add_argument("--bucket-mib", type=float, default=4, help="target size of a recipe bucket")
+    parser.add_argument("--chunksize", type=int, default=20_000, help="raw rows read at a time")
+    parser.add_argument("--max-growth", type=float, default=1.5,
+                        help="allowed ratio of the peak memory of the largest input to the smallest")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of ingredient popularity")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'raw (MiB)':>10} {'rows':>10} {'peak RSS (MiB)':>15}")
+    peaks = []
+    for scale in sorted(args.scales):
+        with tempfile.TemporaryDirectory(prefix="cookie-stream-") as work_dir:
+            raw_path = os.path.join(work_dir, "raw_cookie_data.csv")
+            raw = generate_raw(BASE_RECIPES * scale, round(BASE_INGREDIENTS * scale ** 0.5), zipf=args.zipf,
+                               seed=args.seed)
+            raw.to_csv(raw_path)
+            del raw
+
+            rows, peak = run_stream(raw_path, work_dir, args.chunksize, int(args.bucket_mib * 2**20))
+            print(f"{scale:>6} {os.path.getsize(raw_path) / 2**20:10.1f} {rows:>10} {peak:15.1f}")
+            peaks.append(peak)
+
+    growth = peaks[-1] / peaks[0]
+    print(f"\npeak memory growth from {min(args.scales)}x to {max(args.scales)}x: {growth:.2f} "
+          f"(allowed {args.max_growth:.2f})")
+    if growth > args.max_growth:
+        print("FAIL: the peak memory of the streaming ingest grows with the input")
+    sys.exit(0 if growth <= args.max_growth else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# check_incremental.py
+#
+# Checks that an incremental run of the processing script produces the same outputs
+# as a full run. A synthetic raw corpus (see synthetic_corpus.py) is processed in full,
+# then modified (recipes removed, recipes changed, new recipes with new ingredients) and
+# processed again with --incremental; the partitioned dataset, the recipe summaries and
+# the rating cube are compared with those of a full run over the modified corpus.
+# Exits with status 1 if they differ, so it can run in CI.
+#
+# Each run works in its own temporary directory (the script's relative data/ paths),
+# never on the real data.
+#
+# Usage from the project root:
+# python -m benchmarks.check_incremental --recipes 2000 --ingredients 150
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from benchmarks.synthetic_corpus import BASE_INGREDIENTS, BASE_RECIPES, generate_raw
+from src import data_reading_and_processing as processing
+
+# columns identifying a processed row, to put both outputs in the same order
+ROW_KEY = ["Recipe_Index", "Ingredient", "Text", "Quantity"]
+
+
+def modify(raw: pd.DataFrame, n_ingredients: int, fraction: float, seed: int) -> pd.DataFrame:
+    """
+    Returns `raw` with a `fraction` of its recipes removed, another `fraction` changed (one
+    ingredient row dropped and a new rating) and as many new recipes added, drawn from a
+    larger vocabulary so that new ingredients appear.
+    """
+    rng = np.random.default_rng(seed)
+    recipes = raw["Recipe_Index"].unique()
+    n = max(1, int(len(recipes) * fraction))
+    removed = rng.choice(recipes, n, replace=False)
+    changed = rng.choice(np.setdiff1d(recipes, removed), n, replace=False)
+
+    modified = raw[~raw["Recipe_Index"].isin(removed)]
+    is_changed = modified["Recipe_Index"].isin(changed)
+    modified = modified.drop(modified[is_changed].groupby("Recipe_Index").head(1).index)
+    is_changed = modified["Recipe_Index"].isin(changed)
+    new_ratings = pd.Series(rng.beta(9, 2, n), index=changed)
+    modified.loc[is_changed, "Rating"] = modified.loc[is_changed, "Recipe_Index"].map(new_ratings)
+
+    added = generate_raw(n, n_ingredients + 5, seed=seed + 1)
+    added["Recipe_Index"] = "New_" + added["Recipe_Index"]
+    return pd.concat([modified, added], ignore_index=True)
+
+
+def run(work_dir: str, raws: list, incremental: bool):
+    """
+    Runs the processing script in `work_dir` on each raw corpus of `raws` in turn.
+    """
+    os.makedirs(os.path.join(work_dir, "data", "raw"), exist_ok=True)
+    os.makedirs(os.path.join(work_dir, "data", "processed"), exist_ok=True)
+    source = os.path.join(work_dir, "source.csv")
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        for raw in raws:
+            raw.to_csv(source)
+            processing.main(incremental=incremental, source=source)
+    finally:
+        os.chdir(cwd)
+
+
+def _plain(df: pd.DataFrame, key: list) -> pd.DataFrame:
+    df = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return df[sorted(df.columns)].sort_values(key, kind="stable").reset_index(drop=True)
+
+
+def compare(full_dir: str, incremental_dir: str) -> list:
+    """
+    Returns the differences between the outputs of the two runs (empty if they match).
+    """
+    differences = []
+
+    def check(name, assertion, *args, **kwargs):
+        try:
+            assertion(*args, **kwargs)
+        except AssertionError as e:
+            differences.append(f"{name}: {e}")
+
+    rows = [
+        _plain(ds.dataset(os.path.join(work_dir, processing.PROCESSED_DATASET), format="parquet",
+                          partitioning="hive").to_table().to_pandas(), ROW_KEY)
+        for work_dir in [full_dir, incremental_dir]
+    ]
+    check("processed dataset", pd.testing.assert_frame_equal, *rows, check_dtype=False, rtol=1e-5)
+
+    summaries = [_plain(pd.read_parquet(os.path.join(work_dir, processing.RECIPE_SUMMARIES)), ["Recipe_Index"])
+                 for work_dir in [full_dir, incremental_dir]]
+    check("recipe summaries", pd.testing.assert_frame_equal, *summaries, check_dtype=False, rtol=1e-5)
+
+    full, updated = [dict(np.load(os.path.join(work_dir, processing.RATING_CUBE)))
+                     for work_dir in [full_dir, incremental_dir]]
+    check("cube edges", np.testing.assert_array_equal, full["edges"], updated["edges"])
+    check("cube ingredients", np.testing.assert_array_equal, full["ingredients"], updated["ingredients"])
+    check("cube counts", np.testing.assert_array_equal, full["cum_counts"], updated["cum_counts"])
+    check("cube sums", np.testing.assert_allclose, full["cum_sums"], updated["cum_sums"], rtol=1e-9)
+    # recipes with equal ratings may come in any order
+    for cube in [full, updated]:
+        order = np.lexsort([cube["sorted_recipes"], cube["sorted_ratings"]])
+        cube["sorted_ratings"], cube["sorted_recipes"] = cube["sorted_ratings"][order], cube["sorted_recipes"][order]
+    check("cube ratings", np.testing.assert_allclose, full["sorted_ratings"], updated["sorted_ratings"])
+    check("cube recipes", np.testing.assert_array_equal, full["sorted_recipes"], updated["sorted_recipes"])
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that incremental runs match full runs.")
+    parser.add_argument("--recipes", type=int, default=BASE_RECIPES * 10, help="number of recipes")
+    parser.add_argument("--ingredients", type=int, default=BASE_INGREDIENTS * 3, help="ingredient vocabulary size")
+    parser.add_argument("--fraction", type=float, default=0.05,
+                        help="fraction of the recipes removed, and of those changed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = generate_raw(args.recipes, args.ingredients, seed=args.seed)
+    modified = modify(raw, args.ingredients, args.fraction, args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="cookie-full-") as full_dir, \
+            tempfile.TemporaryDirectory(prefix="cookie-incremental-") as incremental_dir:
+        run(full_dir, [modified], incremental=False)
+        run(incremental_dir, [raw, modified], incremental=True)
+        differences = compare(full_dir, incremental_dir)
+
+    if differences:
+        print("FAIL: the incremental run differs from the full run")
+        for difference in differences:
+            print(f"- {difference}")
+    else:
+        print(f"OK: the incremental run over {len(modified)} raw rows matches the full run")
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# import_budget.py
+#
+# Measures the import time of the web app and of the processing script with
+# `python -X importtime` (in fresh interpreters, best of --repeat runs), lists the
+# slowest imports and checks them against a time budget. It also checks that the
+# modules deferred to first use (the charting libraries in the app, the whole web
+# stack in the processing script) are not imported eagerly.
+# Exits with status 1 if a check fails, so it can run in CI.
+#
+# Usage from the project root:
+# python -m benchmarks.import_budget --app-budget-ms 2500 --processing-budget-ms 1200
+
+import argparse
+import re
+import subprocess
+import sys
+
+# what each target imports, and the modules it must not import at startup
+TARGETS = {
+    # what a worker boots from: the WSGI module, which builds the app (callbacks and layout)
+    "app": (
+        "import src.wsgi",
+        ["altair", "plotly.graph_objects"],
+    ),
+    # the processing script, imported the way `python src/data_reading_and_processing.py` runs it
+    "processing": (
+        "import sys; sys.path.insert(0, 'src'); import data_reading_and_processing",
+        ["dash", "flask", "flask_caching", "altair", "plotly", "requests"],
+    ),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times(statement: str) -> list:
+    """
+    Runs `statement` in a fresh interpreter with -X importtime and returns
+    (module, self microseconds, cumulative microseconds, depth) for every import.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def measure(statement: str, repeat: int) -> list:
+    """
+    Returns the import times of the fastest of `repeat` runs (the first one also compiles the .pyc files).
+    """
+    runs = [import_times(statement) for _ in range(repeat)]
+    return min(runs, key=lambda imports: sum(self_us for _, self_us, _, _ in imports))
+
+
+def check(name: str, budget_ms: float, repeat: int, top: int) -> bool:
+    statement, deferred = TARGETS[name]
+    imports = measure(statement, repeat)
+    total_ms = sum(self_us for _, self_us, _, _ in imports) / 1000
+    modules = {module for module, _, _, _ in imports}
+
+    print(f"\n{name}: {total_ms:.0f} ms for {len(imports)} modules (budget {budget_ms:.0f} ms)")
+    print(f"{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    top_level = sorted((entry for entry in imports if entry[3] == 0), key=lambda entry: -entry[2])
+    for module, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"{cumulative_us / 1000:16.1f} {self_us / 1000:10.1f}  {module}")
+
+    eager = [module for module in deferred if module in modules]
+    if eager:
+        print(f"FAIL: imported at startup, should be deferred: {', '.join(eager)}")
+    if total_ms > budget_ms:
+        print(f"FAIL: over budget by {total_ms - budget_ms:.0f} ms")
+    return not eager and total_ms <= budget_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the app and of the processing script.")
+    parser.add_argument("--app-budget-ms", type=float, default=2500)
+    parser.add_argument("--processing-budget-ms", type=float, default=1200)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per target (the fastest one counts)")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports listed")
+    args = parser.parse_args()
+
+    ok = check("app", args.app_budget_ms, args.repeat, args.top)
+    ok = check("processing", args.processing_budget_ms, args.repeat, args.top) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# synthetic_corpus.py
+#
+# Generates synthetic recipe corpora in the schema of the processed data, for
+# benchmarking the dashboard at sizes the bundled ~200 recipes cannot reach.
+# The ingredient vocabulary starts from the real ingredients (with their usual unit
+# and quantity) and is extended with numbered variants; each recipe draws its
+# ingredients from a Zipf distribution over the vocabulary ranked by real popularity.
+# The raw rows then go through the processing pipeline, so categories, proportions
+# and scores are computed exactly as for the real data.
+#
+# Usage from the project root (then point COOKIE_DATA_PATH, COOKIE_SUMMARIES_PATH
+# and COOKIE_CUBE_PATH at the written files to serve it):
+# python -m benchmarks.synthetic_corpus --recipes 20000 --ingredients 700 --out /tmp/cookie-corpus
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_reading_and_processing import (
+    build_rating_cube,
+    build_recipe_summaries,
+    process_raw_data,
+    write_processed_dataset,
+)
+
+RAW_PATH = "data/raw/raw_cookie_data.csv"
+
+# size of the bundled data, the 1x scale of the benchmarks
+BASE_RECIPES = 209
+BASE_INGREDIENTS = 68
+
+SOURCES = ["AR", "E", "Misc"]
+
+
+def base_vocabulary(raw_path: str = RAW_PATH) -> pd.DataFrame:
+    """
+    Returns the real ingredients ranked by the number of recipes they appear in,
+    with their most common unit and median quantity.
+    """
+    raw = pd.read_csv(raw_path, index_col=0)
+    grouped = raw.groupby("Ingredient")
+    return (
+        pd.DataFrame({
+            "Recipes": grouped["Recipe_Index"].nunique(),
+            "Unit": grouped["Unit"].agg(lambda units: units.mode().iat[0] if units.notna().any() else None),
+            "Quantity": grouped["Quantity"].median(),
+        })
+        .sort_values("Recipes", ascending=False, kind="stable")
+        .reset_index()
+    )
+
+
+def vocabulary(n_ingredients: int, base: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns `n_ingredients` ingredients in popularity-rank order: the real ones first,
+    then numbered variants of them ("sugar 2", ...) in the same order.
+    """
+    repeats = -(-n_ingredients // len(base))
+    vocab = pd.concat(
+        [base.assign(Ingredient=base["Ingredient"] + (f" {i}" if i else "")) for i in range(repeats)],
+        ignore_index=True,
+    )
+    return vocab.head(n_ingredients)[["Ingredient", "Unit", "Quantity"]]
+
+
+def generate_raw(n_recipes: int, n_ingredients: int, zipf: float = 1.1, mean_size: float = 9.5,
+                 seed: int = 0, raw_path: str = RAW_PATH) -> pd.DataFrame:
+    """
+    Generates raw recipe rows (the columns of the published csv).
+
+    Parameters
+    ----------
+    n_recipes : int
+        Number of recipes.
+    n_ingredients : int
+        Size of the ingredient vocabulary.
+    zipf : float
+        Exponent of the Zipf popularity of the ingredients (weight of rank r is r ** -zipf).
+    mean_size : float
+        Average number of ingredient draws per recipe (at least 3; repeated draws of
+        the same ingredient in a recipe are dropped).
+    seed : int
+        Seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = vocabulary(n_ingredients, base_vocabulary(raw_path))
+
+    weights = np.arange(1, len(vocab) + 1, dtype=float) ** -zipf
+    sizes = rng.poisson(max(mean_size - 3, 0), n_recipes) + 3
+    recipe_codes = np.repeat(np.arange(n_recipes), sizes)
+    ingredient_codes = rng.choice(len(vocab), size=len(recipe_codes), p=weights / weights.sum())
+
+    pairs = pd.DataFrame({"recipe": recipe_codes, "ingredient": ingredient_codes}).drop_duplicates()
+    recipe_codes, ingredient_codes = pairs["recipe"].to_numpy(), pairs["ingredient"].to_numpy()
+
+    # recipe ids like the published ones (AR_12, E_3, Misc_40); a tenth of the ratings
+    # fall exactly on a 0.05 grid, as some published ratings do
+    recipe_ids = (
+        pd.Series(rng.choice(SOURCES, n_recipes)) + "_" + pd.Series(np.arange(1, n_recipes + 1)).astype(str)
+    ).to_numpy()
+    ratings = rng.beta(9, 2, n_recipes)
+    on_grid = rng.random(n_recipes) < 0.1
+    ratings[on_grid] = np.round(ratings[on_grid] * 20) / 20
+
+    units = vocab["Unit"].to_numpy()[ingredient_codes]
+    ingredients = vocab["Ingredient"].to_numpy()[ingredient_codes]
+    quantities = np.round(vocab["Quantity"].to_numpy()[ingredient_codes] * rng.lognormal(0, 0.3, len(pairs)), 2)
+
+    return pd.DataFrame({
+        "Ingredient": ingredients,
+        "Text": pd.Series(quantities).astype(str).to_numpy() + " " + units + " " + ingredients,
+        "Recipe_Index": recipe_ids[recipe_codes],
+        "Rating": ratings[recipe_codes],
+        "Quantity": quantities,
+        "Unit": units,
+    })
+
+
+def generate_corpus(n_recipes: int, n_ingredients: int, zipf: float = 1.1, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a processed corpus (the schema of the processed parquet data).
+    """
+    return process_raw_data(generate_raw(n_recipes, n_ingredients, zipf=zipf, seed=seed))
+
+
+def write_corpus(processed: pd.DataFrame, out_dir: str) -> dict:
+    """
+    Writes the processed data, the recipe summaries and the rating cube under `out_dir`,
+    in the layout of data/processed/. Returns the paths, keyed by the load_dataset argument names.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {
+        "path": os.path.join(out_dir, "processed_cookie_data"),
+        "summaries_path": os.path.join(out_dir, "processed_recipe_summaries.parquet"),
+        "cube_path": os.path.join(out_dir, "processed_rating_cube.npz"),
+    }
+    write_processed_dataset(processed, paths["path"])
+    build_recipe_summaries(processed).to_parquet(paths["summaries_path"])
+    np.savez(paths["cube_path"], **build_rating_cube(processed))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic processed recipe corpus.")
+    parser.add_argument("--recipes", type=int, default=BASE_RECIPES * 100, help="number of recipes")
+    parser.add_argument("--ingredients", type=int, default=BASE_INGREDIENTS * 10, help="ingredient vocabulary size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of ingredient popularity")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="output directory")
+    args = parser.parse_args()
+
+    processed = generate_corpus(args.recipes, args.ingredients, zipf=args.zipf, seed=args.seed)
+    paths = write_corpus(processed, args.out)
+    print(f"Wrote {len(processed)} rows ({args.recipes} recipes, {processed['Ingredient'].nunique()} ingredients):")
+    print(f"COOKIE_DATA_PATH={paths['path']}")
+    print(f"COOKIE_SUMMARIES_PATH={paths['summaries_path']}")
+    print(f"COOKIE_CUBE_PATH={paths['cube_path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+# gunicorn.conf.py
+#
+# Usage from the project root:
+# gunicorn -c gunicorn.conf.py
+#
+# The app (and the memory-mapped recipe data, see src/dataset.py) is built once in the
+# master process and inherited by the forked workers, so adding workers adds neither
+# data loading time nor a private copy of the data.
+
+import os
+
+wsgi_app = "src.wsgi:server"
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+bind = f"0.0.0.0:{os.environ.get('PORT', 8050)}"
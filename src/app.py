@@ -1,74 +1,156 @@
 from dash import Dash, html, dcc
 import dash_bootstrap_components as dbc
 from flask_caching import Cache
+from .tiered_cache import TieredCache
+from . import metrics, profiling
 
 # Import component functions
-from .components import *
+from .components import (
+    average_rating,
+    distribution_recipe_ratings,
+    footer,
+    header,
+    ingredient_filter,
+    ingredient_icons,
+    number_of_recipes_per_ingredient,
+    recipes_and_complexity,
+)
 import os
-from os import path as os_path
 
 PREFIX = '/'
 
-app = Dash(
-    __name__,
-    routes_pathname_prefix=PREFIX,
-    requests_pathname_prefix=PREFIX,
-    external_stylesheets=[dbc.themes.BOOTSTRAP]
-)
-
-server = app.server
-
+# Two-tier cache: per-worker in-memory LRU in front of a shared, size-capped directory.
+# Every limit can be overridden with the environment variable of the same name.
+# Created without an app so the callbacks can memoize with it; bound in create_app.
 cache = Cache(
-    server,
     config={
-        'CACHE_TYPE': 'filesystem',
-        'CACHE_DIR': os.environ.get("CACHE_DIR", "/tmp")
+        'CACHE_TYPE': f"{TieredCache.__module__}.TieredCache",
+        'CACHE_DIR': os.environ.get("CACHE_DIR", "/tmp/cookie-dash-cache"),
+        'CACHE_DEFAULT_TIMEOUT': int(os.environ.get("CACHE_DEFAULT_TIMEOUT", 24 * 60 * 60)),  # seconds
+        'CACHE_MEMORY_MAX_ENTRIES': int(os.environ.get("CACHE_MEMORY_MAX_ENTRIES", 256)),
+        'CACHE_MEMORY_MAX_BYTES': int(os.environ.get("CACHE_MEMORY_MAX_BYTES", 64 * 2**20)),
+        'CACHE_THRESHOLD': int(os.environ.get("CACHE_THRESHOLD", 2000)),  # max files on disk
+        'CACHE_DISK_MAX_BYTES': int(os.environ.get("CACHE_DISK_MAX_BYTES", 512 * 2**20)),
     }
 )
 
-from . import callbacks
-
-# Layout mimicking the original HTML structure
-app.layout = html.Div(
-    className="content",
-    children=[
-        dcc.Store(id='selected-subcategory', storage_type='memory'),
-        header(),
-        html.Main(
-            children=[
-                html.Div(
-                    className="grid",
-                    children=[
-                        ingredient_icons(),
-                        ingredient_filter(),
-                        distribution_recipe_ratings(),
-                        average_rating(),
-                        number_of_recipes_per_ingredient(),
-                        recipes_and_complexity()
-                    ],
-                    style={
-                        "display": "grid",
-                        "gridTemplateColumns": (
-                            "[col1-start] 1fr [col2-start] 1fr [col3-start] 1fr [col4-start] 1fr [col5-start] 1fr "
-                            "[col6-start] 1fr [col7-start] 1fr [col8-start] 1fr [col9-start] 1fr [col10-start] 1fr [col11-end]"
-                        ),
-                        "gridTemplateRows": (
-                            "[row1-start] 1fr [row2-start] 1fr [row3-start] 1fr [row4-start] 1fr "
-                            "[row5-start] 1fr [row6-start] 1fr [row7-start] 1fr [row8-start] 1fr [row9-end]"
-                        ),
-                        "height": "80vh",
-                        "gap": "1vw",
-                        "margin": "0 5vw",
-                    }
-                )
-            ]
-        ),
-        footer()
-    ],
-    style={
-        "backgroundColor": "#F5E1C8",
-    }
-)
+
+def create_app(preload_data: bool = True) -> Dash:
+    """
+    Builds the Dash app: server, cache, instrumentation, callbacks and layout.
+
+    Call it once per process (get_app does): the callbacks are registered when
+    callbacks.py is first imported, so the Dash apps created after the first one get
+    none of them.
+
+    With `preload_data`, the recipe data is loaded (memory-mapped, see dataset.py) before
+    the app is returned. Under `gunicorn --preload` this happens once in the master
+    process and the forked workers share it instead of each loading their own copy.
+    """
+    app = Dash(
+        __name__,
+        routes_pathname_prefix=PREFIX,
+        requests_pathname_prefix=PREFIX,
+        external_stylesheets=[dbc.themes.BOOTSTRAP]
+    )
+
+    cache.init_app(app.server)
+
+    # Per-callback latency / cache / payload metrics on /metrics and Server-Timing headers (see metrics.py)
+    metrics.init_app(app, cache)
+
+    # Opt-in callback profiling (PROFILE_CALLBACKS / PROFILE_ADMIN_TOKEN, see profiling.py)
+    profiling.init_app(app)
+
+    # registers the callbacks
+    from . import callbacks  # noqa: F401
+
+    app.layout = layout()
+
+    if preload_data:
+        from .dataset import get_dataset
+        get_dataset()
+
+    return app
+
+
+def layout():
+    # Layout mimicking the original HTML structure
+    return html.Div(
+        className="content",
+        children=[
+            dcc.Store(id='selected-subcategory', storage_type='memory'),
+            dcc.Store(id='filter-request', storage_type='memory'),
+            header(),
+            html.Main(
+                children=[
+                    html.Div(
+                        className="grid",
+                        children=[
+                            ingredient_icons(),
+                            ingredient_filter(),
+                            distribution_recipe_ratings(),
+                            average_rating(),
+                            number_of_recipes_per_ingredient(),
+                            recipes_and_complexity()
+                        ],
+                        style={
+                            "display": "grid",
+                            "gridTemplateColumns": (
+                                "[col1-start] 1fr [col2-start] 1fr [col3-start] 1fr [col4-start] 1fr [col5-start] 1fr "
+                                "[col6-start] 1fr [col7-start] 1fr [col8-start] 1fr [col9-start] 1fr [col10-start] 1fr [col11-end]"
+                            ),
+                            "gridTemplateRows": (
+                                "[row1-start] 1fr [row2-start] 1fr [row3-start] 1fr [row4-start] 1fr "
+                                "[row5-start] 1fr [row6-start] 1fr [row7-start] 1fr [row8-start] 1fr [row9-end]"
+                            ),
+                            "height": "80vh",
+                            "gap": "1vw",
+                            "margin": "0 5vw",
+                        }
+                    )
+                ]
+            ),
+            footer()
+        ],
+        style={
+            "backgroundColor": "#F5E1C8",
+        }
+    )
+
+
+_app = None
+
+
+def get_app() -> Dash:
+    """
+    Returns the app of this process, creating it on first use (and warming the cache
+    if CACHE_WARMUP is set). The WSGI entry point is src/wsgi.py.
+    """
+    global _app
+    if _app is None:
+        _app = create_app()
+
+        # Opt-in: precompute the charts and recipe list for every slider position before taking traffic (see warmup.py)
+        if os.environ.get("CACHE_WARMUP"):
+            from .warmup import run_warmup
+            run_warmup(
+                top_n=int(os.environ.get("CACHE_WARMUP_TOP_N", 0)),
+                workers=int(os.environ.get("CACHE_WARMUP_WORKERS", 0)) or None
+            )
+    return _app
+
+
+def server(environ, start_response):
+    """
+    WSGI entry point kept for deploys started with `gunicorn src.app:server`: builds the
+    app on the first request of each worker instead of on import (so not in the gunicorn
+    master). New deploys use src.wsgi:server.
+    """
+    return get_app().server(environ, start_response)
+
 
 if __name__ == '__main__':
-    app.run_server()
\ No newline at end of file
+    # run the package module, the one the callbacks import the cache from, not this __main__ copy
+    from .app import get_app as package_get_app
+    package_get_app().run_server()
@@ -0,0 +1,42 @@
+// Clientside callbacks for pure UI state (see "Clientside vs. server-side callbacks" in CONTRIBUTING.md).
+// They are registered in src/callbacks.py with ClientsideFunction(namespace="cookie", ...).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    cookie: {
+        // Subcategory of the last clicked icon button, "flour" until a button is clicked.
+        update_selected_subcategory: function (n_clicks_list) {
+            const ctx = window.dash_clientside.callback_context;
+            const total = (n_clicks_list || []).reduce((sum, n) => sum + (n || 0), 0);
+            if (!ctx.triggered || ctx.triggered.length === 0 || total === 0) {
+                return "flour";
+            }
+            const propId = ctx.triggered[0].prop_id;
+            if (!propId || propId === ".") {
+                return "flour";
+            }
+            return JSON.parse(propId.slice(0, propId.lastIndexOf("."))).index;
+        },
+
+        // Highlight the button of the selected subcategory.
+        update_active_buttons: function (selected_subcat, ids) {
+            return ids.map((id) => id.index === selected_subcat);
+        },
+
+        // Names of the selected ingredients as list items.
+        show_selected_ingredients: function (selected_ingredients) {
+            const li = (text) => ({namespace: "dash_html_components", type: "Li", props: {children: text}});
+            if (!selected_ingredients || selected_ingredients.length === 0) {
+                return [li("No ingredients selected")];
+            }
+            return selected_ingredients.map(li);
+        },
+
+        // Id of the page and sequence number of its latest filter change, sent with the
+        // filter callbacks so that the server can drop superseded requests.
+        next_filter_request: function (rating_range, selected_ingredients, match_mode, previous) {
+            if (!previous) {
+                return {client: Math.random().toString(36).slice(2), seq: 1};
+            }
+            return {client: previous.client, seq: previous.seq + 1};
+        }
+    }
+});
@@ -1,52 +1,92 @@
-from dash import callback, Output, Input, State, callback_context, ALL, html
+from dash import callback, clientside_callback, ClientsideFunction, Output, Input, State, callback_context, ALL, MATCH, html
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
+import numpy as np
 import pandas as pd
-import ast
-import altair as alt
-import json
-import plotly.graph_objects as go
+import math
+from dataclasses import dataclass
+from functools import lru_cache
 from .app import cache
+from .charts import BAR_CHART_DATA, HISTOGRAM_DATA, as_patch
+from .dataset import get_dataset
+from .filters import canonical_filters
+from .inflight import is_superseded, single_flight
+from .ingredient_index import MATCH_ANY
+from . import metrics
+from .profiling import profiled
 
-# ingredient icons callbacks
-parquet_path = "data/processed/processed_cookie_data.parquet"
-
-try:
-    df_recipes = pd.read_parquet(parquet_path)
-except FileNotFoundError:
-    # Create empty DataFrame with expected columns if parquet not found
-    df_recipes = pd.DataFrame(
-        columns=["Recipe_Index", "Complexity_Score", "Rating", "Ingredient", "category", "subcategory"]
-    )
+# Callbacks that only move UI state around (which button is active, echoing the
+# selection) run in the browser; their JavaScript lives in assets/clientside.js.
+# Anything that reads the recipe data stays server-side. See CONTRIBUTING.md.
+# The charts start from the plain-dict skeletons in charts.py (the app imports no charting
+# library); the callbacks send their data as Patches.
 
-@callback(
+# number of recipes shown per page of the recipe list
+RECIPE_PAGE_SIZE = 25
+
+TOOLTIP_PLACEHOLDER = "Loading ingredients..."
+
+# ingredient icons callbacks
+clientside_callback(
+    ClientsideFunction(namespace="cookie", function_name="update_selected_subcategory"),
     Output('selected-subcategory', 'data'),
     Input({'type': 'subcategory-button', 'index': ALL}, 'n_clicks')
 )
-def update_selected_subcategory(n_clicks_list):
-    ctx = callback_context
-    # If there is no trigger or no clicks, default to "flour"
-    if not ctx.triggered or sum(n_clicks_list) == 0:
-        return "flour"
-    triggered_id_str = ctx.triggered[0]['prop_id'].split('.')[0]
-    triggered_id = ast.literal_eval(triggered_id_str)
-    return triggered_id['index']
 
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace="cookie", function_name="update_active_buttons"),
     Output({'type': 'subcategory-button', 'index': ALL}, 'active'),
     Input('selected-subcategory', 'data'),
     State({'type': 'subcategory-button', 'index': ALL}, 'id')
 )
-def update_active_buttons(selected_subcat, ids):
-    return [id_dict['index'] == selected_subcat for id_dict in ids]
 
 # ingredient filter callbacks
-try:
-    df_recipes = pd.read_parquet(parquet_path)
-except FileNotFoundError:
-    df_recipes = pd.DataFrame(
-        columns=["Recipe_Index", "Complexity_Score", "Rating", 
-                 "Ingredient", "category", "subcategory", "Popularity_Score"]
+# The checklist values and the selected subcategory come from the client: only the options
+# of ingredients in the data are cached (the cache is bounded by the vocabulary), and the
+# per-subcategory options are kept for a bounded number of subcategories.
+
+# number of subcategories whose checklist options are kept
+SUBCATEGORY_CACHE_SIZE = 32
+
+def build_ingredient_option(ing, pop_score):
+    """
+    Builds the checklist option for one ingredient, labelled with its popularity score.
+    """
+    # Format to always have two decimals
+    pop_score_str = f"{pop_score:.2f}"
+
+    label = html.Div(
+        [
+            html.Span(ing, style={"flex": "1", "textAlign": "left"}),
+            html.Span(pop_score_str, style={"minWidth": "50px", "textAlign": "right"})
+        ],
+        style={"display": "flex", "justifyContent": "space-between", "width": "100%"}
     )
+    return {"label": label, "value": ing}
+
+@lru_cache(maxsize=None)
+def ingredient_option(ing):
+    """
+    Returns the checklist option of an ingredient of the data (built once).
+    """
+    return build_ingredient_option(ing, get_dataset().popularity[ing])
+
+def selected_ingredient_option(ing):
+    """
+    Returns the checklist option of a selected ingredient, which the client sent: cached
+    only if the data has that ingredient.
+    """
+    if ing in get_dataset().popularity:
+        return ingredient_option(ing)
+    return build_ingredient_option(ing, 0.00)
+
+@lru_cache(maxsize=SUBCATEGORY_CACHE_SIZE)
+def subcategory_options(selected_subcat):
+    """
+    Builds (once per subcategory) the checklist options sorted by popularity, high -> low.
+    """
+    ingredients_sorted = get_dataset().ingredients_by_popularity(selected_subcat or None)
+    return frozenset(ingredients_sorted), tuple(ingredient_option(ing) for ing in ingredients_sorted)
 
 @callback(
     Output('ingredient-checklist', 'options'),
@@ -55,6 +95,7 @@ except FileNotFoundError:
     Input('deselect-all-button', 'n_clicks'),
     State('ingredient-checklist', 'value')
 )
+@profiled
 def update_ingredient_checklist(selected_subcat, n_clicks_deselect, previously_selected):
     ctx = callback_context
     # If "Deselect All" was clicked, clear the selected ingredients.
@@ -63,196 +104,325 @@ def update_ingredient_checklist(selected_subcat, n_clicks_deselect, previously_s
     else:
         new_value = previously_selected if previously_selected is not None else []
 
-    # Filter recipes for the chosen subcategory
-    if not selected_subcat:
-        df_sub = df_recipes.copy()
-    else:
-        df_sub = df_recipes[df_recipes["subcategory"] == selected_subcat].copy()
-
-    # Sort by popularity high -> low
-    df_sub = df_sub.sort_values(by="Popularity_Score", ascending=False)
-    ingredients_sorted = df_sub["Ingredient"].dropna().unique()
-
-    new_options = []
-    for ing in ingredients_sorted:
-        pop_series = df_recipes[df_recipes["Ingredient"] == ing]["Popularity_Score"]
-        pop_score = pop_series.mean() if not pop_series.empty else 0.00
-        # Format to always have two decimals
-        pop_score_str = f"{pop_score:.2f}"
-
-        label = html.Div(
-            [
-                html.Span(ing, style={"flex": "1", "textAlign": "left"}),
-                html.Span(pop_score_str, style={"minWidth": "50px", "textAlign": "right"})
-            ],
-            style={"display": "flex", "justifyContent": "space-between", "width": "100%"}
-        )
-        new_options.append({"label": label, "value": ing})
+    # Options for the chosen subcategory, precomputed and sorted by popularity high -> low
+    shown, options = subcategory_options(selected_subcat)
+    new_options = list(options)
 
     # Preserve any previously selected ingredient not in the current subcategory.
-    # (You may choose to sort these or just append them at the end.)
-    if not (ctx.triggered and 'deselect-all-button' in ctx.triggered[0]['prop_id']):
-        old_still_needed = [ing for ing in new_value if ing not in ingredients_sorted]
-        for old_ing in old_still_needed:
-            pop_series = df_recipes[df_recipes["Ingredient"] == old_ing]["Popularity_Score"]
-            pop_score = pop_series.mean() if not pop_series.empty else 0.00
-            pop_score_str = f"{pop_score:.2f}"
-
-            label = html.Div(
-                [
-                    html.Span(old_ing, style={"flex": "1", "textAlign": "left"}),
-                    html.Span(pop_score_str, style={"minWidth": "50px", "textAlign": "right"})
-                ],
-                style={"display": "flex", "justifyContent": "space-between", "width": "100%"}
-            )
-            new_options.append({"label": label, "value": old_ing})
+    # (appended at the end)
+    new_options.extend(selected_ingredient_option(ing) for ing in new_value if ing not in shown)
 
     return new_options, new_value
 
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace="cookie", function_name="show_selected_ingredients"),
     Output('selected-ingredients-list', 'children'),
     Input('ingredient-checklist', 'value')
 )
-def show_selected_ingredients(selected_ingredients):
+
+# numbers the filter changes of the page, so that the server can drop the requests
+# of changes that a newer one has superseded (see inflight.py)
+clientside_callback(
+    ClientsideFunction(namespace="cookie", function_name="next_filter_request"),
+    Output('filter-request', 'data'),
+    Input('rating-range', 'value'),
+    Input('ingredient-checklist', 'value'),
+    Input('ingredient-match-mode', 'value'),
+    State('filter-request', 'data')
+)
+
+# shared filter stages feeding the rating histogram, the gauge, the ingredient bar chart and the recipe list
+def matching_recipes(rating_range, selected_ingredients, match_mode=MATCH_ANY):
+    """
+    Returns the bitset of recipes within the rating range that match the selected
+    ingredients ("any" or "all" of them, depending on `match_mode`).
+    """
+    index = get_dataset().index
+    return (
+        index.rating_range(rating_range[0], rating_range[1])
+        & index.match(selected_ingredients, mode=match_mode or MATCH_ANY)
+    )
+
+@dataclass(frozen=True)
+class FilterResult:
+    """
+    The aggregates of the recipes matching one (rating range, ingredient selection,
+    match mode) combination that the charts are drawn from.
+    """
+    rating_range: tuple
+    selected_ingredients: tuple
+    avg_rating: float
+    recipe_ratings: pd.DataFrame      # one row per matching recipe: Recipe_Index, Rating
+    ingredient_counts: pd.DataFrame   # Ingredient, Recipe_Count sorted by count (high -> low)
+
+# single_flight inside lru_cache: concurrent misses of the same key compute it once
+@lru_cache(maxsize=128)
+@single_flight
+def filter_recipes(rating_range, selected_ingredients=(), match_mode=MATCH_ANY):
+    """
+    Filters the recipes once per input combination and computes the shared aggregates.
+
+    Rating ranges on the slider grid are answered from the aggregate cube (counts and
+    rating sums) and the rating-sorted recipe array; the ingredient index is only
+    used for the parts the cube cannot answer (ratings of recipes matching a selection,
+    counts in "all" mode).
+
+    Parameters
+    ----------
+    rating_range : tuple of float
+        The (low, high) bounds of the rating slider.
+    selected_ingredients : tuple of str
+        The selected ingredients (sorted, see `filters.canonical_filters`);
+        empty means no ingredient filter.
+    match_mode : {"any", "all"}
+        Whether recipes must contain any or all of the selected ingredients.
+
+    Returns
+    -------
+    FilterResult
+        The aggregates of the filtered recipe set.
+    """
+    data = get_dataset()
+    ingredient_index = data.index
+    cube = data.cube
+    low, high = rating_range
+    on_grid = cube.covers(low, high)
+    bits = None
+
+    # one row per matching recipe
     if not selected_ingredients:
-        return [html.Li("No ingredients selected")]
-    return [html.Li(ing) for ing in selected_ingredients]
+        recipe_ratings = cube.ratings_between(low, high)
+    else:
+        bits = matching_recipes(rating_range, selected_ingredients, match_mode)
+        recipe_ratings = pd.DataFrame({
+            "Recipe_Index": ingredient_index.recipes(bits),
+            "Rating": ingredient_index.recipe_ratings[ingredient_index.mask(bits)]
+        })
+
+    if on_grid and not selected_ingredients:
+        avg_rating = cube.mean_rating(low, high)
+    else:
+        avg_rating = float(recipe_ratings["Rating"].mean()) if not recipe_ratings.empty else 0
 
-# distribution recipe ratings callbacks to update x-axis based on slider values
-df = pd.read_parquet("data/processed/processed_cookie_data.parquet")
+    # number of unique recipes each ingredient appears in
+    # (only the selected ingredients are counted when there is a selection)
+    if on_grid and match_mode == MATCH_ANY:
+        ingredient_counts = cube.ingredient_counts(low, high, selected_ingredients)
+    else:
+        if bits is None:
+            bits = matching_recipes(rating_range, selected_ingredients, match_mode)
+        ingredient_counts = ingredient_index.ingredient_counts(bits, selected_ingredients)
+    ingredient_counts = (
+        ingredient_counts.reset_index()
+        .sort_values(by="Recipe_Count", ascending=False, kind="stable")
+    )
+
+    return FilterResult(
+        rating_range=tuple(rating_range),
+        selected_ingredients=tuple(selected_ingredients),
+        avg_rating=avg_rating,
+        recipe_ratings=recipe_ratings,
+        ingredient_counts=ingredient_counts,
+    )
+
+@lru_cache(maxsize=128)
+@single_flight
+def filter_recipe_table(rating_range, selected_ingredients=(), match_mode=MATCH_ANY):
+    """
+    Returns the matching recipes in display order (by numeric recipe index), selected
+    from the recipe summaries. Same arguments as `filter_recipes`, whose (cached) result
+    it reuses instead of matching the recipes again.
+    """
+    recipe_table = get_dataset().recipe_table
+    matching = filter_recipes(rating_range, selected_ingredients, match_mode).recipe_ratings["Recipe_Index"]
+    return recipe_table[recipe_table["Recipe_Index"].isin(matching)]
 
 @callback(
     Output("rating_histogram", "spec"),
-    Input("rating-range", "value"),
-    Input("ingredient-checklist", "value"),
+    Output("rating_gauge", "figure"),
+    Output("ingredient_bar_chart", "spec"),
+    Output("remaining-ingredients", "children"),
+    Input("filter-request", "data"),
+    State("rating-range", "value"),
+    State("ingredient-checklist", "value"),
+    State("ingredient-match-mode", "value"),
 )
-@cache.memoize()
-def create_ratings_distribution(rating_range=[0, 1], selected_ingredients=None):
-    filtered_df = df.query('Rating.between(@rating_range[0], @rating_range[1])')
+@profiled
+def update_dashboard(filter_request=None, rating_range=[0, 1], selected_ingredients=None, match_mode=MATCH_ANY):
+    """
+    Filters the recipes once and updates every chart that depends on the filters, so
+    that the charts cost one request and one cache entry per filter change. The recipe
+    list is a second request (`update_recipe_page`), which reuses the same filter pass
+    when both reach the same worker.
 
-    if selected_ingredients:
-        filtered_df = filtered_df[filtered_df["Ingredient"].isin(selected_ingredients)]
+    The charts start from the skeletons of charts.py; only their data and values are
+    sent, as partial (Patch) updates.
 
-    # group by recipe ID so that there is only one entry per recipe instead of per ingredient in the recipe
-    # the recipe's rating per ingredient should be the same, so "mean" doesn't really do anything
-    filtered_df = filtered_df.groupby("Recipe_Index")['Rating'].mean().reset_index()
+    Runs on every filter change (see `filter-request`); nothing is sent back when a newer
+    change from the same page has already arrived.
+    """
+    if is_superseded(filter_request):
+        raise PreventUpdate
 
+    # equivalent inputs (ingredient order, None vs [], unsnapped slider floats) share one cache entry
+    key = canonical_filters(rating_range, selected_ingredients, match_mode)
+    metrics.cache_lookup()
+    histogram, gauge, bar_chart, remaining_ingredients = dashboard_updates(*key)
 
-    chart = alt.Chart(filtered_df).mark_bar().encode(
-        alt.X("Rating:Q", bin=alt.Bin(maxbins=10),
-              title="Rating",
-              scale=alt.Scale(domain=rating_range),
-              axis=alt.Axis(domainColor="#3E2723", tickColor='#3E2723')
-              ),
-        alt.Y("count():Q",
-              title="Count",
-              axis=alt.Axis(gridColor='#D2A679', domainColor="#3E2723", tickColor='#3E2723')
-              ),
-        tooltip=[alt.Tooltip("count():Q", title="Number of Recipes")],
-        color=alt.value('#906A51')
-    ).properties(width="container", height = "container"
-    ).configure(background='#F5E1C8').configure_view(strokeWidth=0)
+    if is_superseded(filter_request):
+        raise PreventUpdate
+    return as_patch(histogram), as_patch(gauge), as_patch(bar_chart), remaining_ingredients
 
-    return (chart.to_dict())
+# single_flight outside the memoization: concurrent callers of a key wait for one cache lookup (and miss)
+@single_flight
+@cache.memoize()
+def dashboard_updates(rating_range, selected_ingredients, match_mode):
+    """
+    Computes the chart updates for one canonical filter key (see `filters.canonical_filters`).
+    """
+    metrics.cache_miss()
+
+    with metrics.phase("filter"):
+        result = filter_recipes(rating_range, selected_ingredients, match_mode)
+
+    with metrics.phase("render"):
+        bar_chart, remaining_ingredients = create_ingredient_distribution(result)
+        updates = (
+            create_ratings_distribution(result),
+            update_gauge_chart(result),
+            bar_chart,
+            remaining_ingredients,
+        )
 
-# average rating callback
-df = pd.read_parquet("data/processed/processed_cookie_data.parquet")
+    return updates
 
 @callback(
-    Output("rating_gauge", "figure"),
-    Input("rating_gauge", "id"),  # No need for slider input
-    Input("rating-range", "value"),
-    Input("ingredient-checklist", "value"),
+    Output("recipe-list", "children"),
+    Output("recipe-total", "children"),
+    Output("recipe-pagination", "max_value"),
+    Output("recipe-pagination", "active_page"),
+    Input("filter-request", "data"),
+    Input("recipe-pagination", "active_page"),
+    State("rating-range", "value"),
+    State("ingredient-checklist", "value"),
+    State("ingredient-match-mode", "value"),
 )
+@profiled
+def update_recipe_page(filter_request=None, active_page=1, rating_range=[0, 1], selected_ingredients=None,
+                       match_mode=MATCH_ANY):
+    """
+    Shows one page of the filtered recipe list; a filter change goes back to the first page.
+    Like `update_dashboard`, it drops requests superseded by a newer filter change.
+    """
+    if is_superseded(filter_request):
+        raise PreventUpdate
+
+    key = canonical_filters(rating_range, selected_ingredients, match_mode)
+    requested_page = (active_page or 1) if callback_context.triggered_id == "recipe-pagination" else 1
+    metrics.cache_lookup()
+    recipe_list, recipe_total, n_pages, page = recipe_page(*key, requested_page)
+
+    if is_superseded(filter_request):
+        raise PreventUpdate
+    return recipe_list, recipe_total, n_pages, page
+
+# memoized in the shared cache like `dashboard_updates`, so that the first page of every
+# warmed filter key is served without a filter pass in any worker (see warmup.py)
+@single_flight
 @cache.memoize()
-def update_gauge_chart(_, rating_range=[0, 1], selected_ingredients=None):
-    """
-    Compute the average rating and update the gauge with a moving dial color.
-    """
-    # connect to the ratings slider
-    filtered_df = df.query('Rating.between(@rating_range[0], @rating_range[1])')
-
-    # If ingredients are selected, filter by those as well
-    if selected_ingredients:
-        filtered_df = filtered_df[filtered_df["Ingredient"].isin(selected_ingredients)]
-
-    # group by recipe ID so that there is only one entry per recipe instead of per ingredient in the recipe
-    # the recipe's rating per ingredient should be the same, so "mean" doesn't really do anything
-    filtered_df = filtered_df.groupby("Recipe_Index")['Rating'].mean().reset_index()
-
-    # Compute average rating
-    avg_rating = filtered_df["Rating"].mean() if not filtered_df.empty else 0
-
-    # Create Plotly Gauge with a dynamically moving dial color
-    fig = go.Figure(
-        go.Indicator(
-            mode="gauge+number",
-            value=round(avg_rating, 2),
-            # title={"text": f"Average Rating: {avg_rating:.2f}", "font": {"size": 16}},
-            domain={"x": [0, 1], "y": [0, 1]},   # Fill the entire chart area (full circle)
-            gauge={
-                "axis": {
-                    "range": [0, 1],
-                    "tickmode": "linear",
-                    "tick0": 0,
-                    "dtick": 0.2,
-                    "tickfont": {"color": "#000", "size": 12}
-                },
-                "bar": {"color": "#3E2723", "thickness": 0.3},  # Ensure the dial color is distinct
-                "steps": [
-                    {"range": [0, avg_rating], "color": "#906A51"},  # Color up to average rating
-                    {"range": [avg_rating, 1], "color": "#F5E1C8"},  # Remaining range
-                ],
-                "threshold": {
-                    "line": {"color": "#3E2723", "width": 4},
-                    "thickness": 0.75,  # Adjusted for a clear marker
-                    "value": avg_rating
-                },
-                "borderwidth": 0,
-                "bordercolor": "#D2A679",
-                
-            }
-        )
-    )
+def recipe_page(rating_range, selected_ingredients, match_mode, page):
+    """
+    Renders one page of the recipe list for one canonical filter key, `page` being
+    clamped to the pages there are. Returns (recipe list, total, number of pages, page).
+    """
+    metrics.cache_miss()
 
-    # Adjust layout to fit the small container
-    fig.update_layout(
-        autosize=True, 
-        margin=dict(l=5, r=5, t=35, b=5),
-        paper_bgcolor="#D2A679",  # Match outer container
-        font=dict(color="#000")
-    )
+    with metrics.phase("filter"):
+        recipes = filter_recipe_table(rating_range, selected_ingredients, match_mode)
+
+    n_pages = max(math.ceil(len(recipes) / RECIPE_PAGE_SIZE), 1)
+    page = min(max(page, 1), n_pages)
 
-    return fig
+    with metrics.phase("render"):
+        recipe_list, recipe_total = update_recipe_list(recipes, page)
+    return recipe_list, recipe_total, n_pages, page
 
-# number of recipes per ingredient callbacks
 @callback(
-    [Output("ingredient_bar_chart", "spec"), Output("remaining-ingredients", "children")], 
-    Input("rating-range", "value"),
-    Input("ingredient-checklist", "value")
+    Output({"type": "recipe-tooltip", "index": MATCH}, "children"),
+    Input({"type": "recipe-tooltip", "index": MATCH}, "is_open"),
+    State({"type": "recipe-tooltip", "index": MATCH}, "children"),
+    prevent_initial_call=True,
 )
-@cache.memoize()
-def create_ingredient_distribution(rating_range=[0, 1], selected_ingredients=None):
-    """
-    Generates a bar chart showing the top 10 ingredients and a compact multi-column list of remaining ingredients.
-    """
-    # Filter data based on rating range
-    filtered_df = df.query('Rating.between(@rating_range[0], @rating_range[1])')
-
-    # If specific ingredients are selected, filter by those
-    if selected_ingredients:
-        filtered_df = filtered_df[filtered_df["Ingredient"].isin(selected_ingredients)]
-    
-    # Compute the number of unique recipes each ingredient appears in
-    df_ingredient_counts = (
-        filtered_df.groupby("Ingredient")["Recipe_Index"]
-        .nunique()
-        .reset_index()
-    )
-    df_ingredient_counts.columns = ["Ingredient", "Recipe_Count"]
+@profiled
+def load_recipe_tooltip(is_open, children):
+    """
+    Fills in a recipe's ingredient tooltip the first time it is shown.
+    """
+    if not is_open or children != TOOLTIP_PLACEHOLDER:
+        raise PreventUpdate
+    recipe_id = callback_context.triggered_id["index"]
+    return f"Ingredients:\n{get_dataset().recipe_ingredients_text(recipe_id)}"
 
-    # Sort ingredients by recipe count
-    df_sorted = df_ingredient_counts.sort_values(by="Recipe_Count", ascending=False)
+# distribution recipe ratings
+HISTOGRAM_MAX_BINS = 10
+
+def histogram_edges(low, high, maxbins=HISTOGRAM_MAX_BINS):
+    """
+    Returns "nice" bin edges covering [low, high] with at most `maxbins` bins, the way
+    Vega's bin transform picks them: the step is the smallest 1, 2 or 5 times a power
+    of ten that fits.
+    """
+    width = high - low
+    if width <= 0:
+        step = 0.01
+    else:
+        magnitude = 10 ** math.floor(math.log10(width / maxbins))
+        step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude * maxbins >= width - 1e-12)
+    start = math.floor(round(low / step, 9)) * step
+    n_bins = max(math.ceil(round((high - start) / step, 9)), 1)
+    return np.round(start + np.arange(n_bins + 1) * step, 10)
+
+def create_ratings_distribution(result):
+    """
+    Returns the update of the rating histogram: the bins of the ratings of the filtered
+    recipes, and the x-axis following the slider.
+
+    The ratings are binned here and only the bins (start, end, count) are sent to the
+    browser, so the update has the same size however many recipes match.
+    """
+    ratings = result.recipe_ratings["Rating"].to_numpy(dtype=float)
+    edges = histogram_edges(*result.rating_range)
+    counts, _ = np.histogram(ratings[~np.isnan(ratings)], bins=edges)
+    bins = pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+    return [
+        (("datasets", HISTOGRAM_DATA), bins.to_dict("records")),
+        (("encoding", "x", "scale", "domain"), list(result.rating_range)),
+    ]
+
+# average rating
+def update_gauge_chart(result):
+    """
+    Returns the update of the gauge: the average rating, with the dial color moving with it.
+    """
+    # Average rating of the filtered recipes
+    avg_rating = float(result.avg_rating)
+
+    return [
+        (("data", 0, "value"), round(avg_rating, 2)),
+        (("data", 0, "gauge", "steps", 0, "range"), [0, avg_rating]),  # Color up to average rating
+        (("data", 0, "gauge", "steps", 1, "range"), [avg_rating, 1]),  # Remaining range
+        (("data", 0, "gauge", "threshold", "value"), avg_rating),
+    ]
+
+# number of recipes per ingredient
+def create_ingredient_distribution(result):
+    """
+    Returns the update of the bar chart (the top 10 ingredients) and a compact multi-column
+    list of the remaining ingredients.
+    """
+    # Ingredients sorted by the number of filtered recipes they appear in
+    df_sorted = result.ingredient_counts
 
     # Select top 10 ingredients for the bar chart
     df_top_ingredients = df_sorted.head(10)
@@ -260,34 +430,9 @@ def create_ingredient_distribution(rating_range=[0, 1], selected_ingredients=Non
     # Get the remaining ingredients (those NOT in the top 10)
     df_remaining_ingredients = df_sorted.iloc[10:]
 
-    # Create the bar chart
-    chart = (
-        alt.Chart(df_top_ingredients)
-        .mark_bar()
-        .encode(
-            alt.X("Recipe_Count:Q",
-                  title="Number of Recipes",
-                  axis=alt.Axis(gridColor='#D2A679', domainColor="#3E2723", tickColor='#3E2723')),
-            alt.Y("Ingredient:N",
-                  sort='-x',
-                  title="Ingredient",
-                  axis=alt.Axis(domainColor="#3E2723", tickColor='#3E2723')),
-            tooltip=[alt.Tooltip("Recipe_Count:Q", title="Number of Recipes")],
-            color=alt.value('#906A51')
-        )
-        .properties(
-            width="container",
-            height=alt.Step(28)  
-        )
-        .configure_view(strokeWidth=0)
-        .configure_axis(
-            labelLimit=0,
-            labelFontSize=10,
-            titleFontSize=12
-        ).configure(
-        background='#F5E1C8'
-        )
-    )
+    bar_chart = [
+        (("datasets", BAR_CHART_DATA), df_top_ingredients[["Ingredient", "Recipe_Count"]].to_dict("records")),
+    ]
 
     # Create a multi-column inline list
     if not df_remaining_ingredients.empty:
@@ -306,78 +451,34 @@ def create_ingredient_distribution(rating_range=[0, 1], selected_ingredients=Non
             style={"fontStyle": "italic", "width": "100%"}
         )
 
-    return chart.to_dict(), remaining_content
-
-# recipes and complexity callbacks
-try:
-    df_recipes = pd.read_parquet(parquet_path)
+    return bar_chart, remaining_content
 
-    # Ensure Complexity_Score exists
-    if "Complexity_Score" not in df_recipes.columns:
-        df_recipes["Complexity_Score"] = 0  # Default value if missing
-
-    df_recipes["Complexity_Score"] = df_recipes["Complexity_Score"].fillna(0)  # Replace NaN with 0
-except FileNotFoundError:
-    df_recipes = pd.DataFrame(columns=["Recipe_Index", "Ingredient", "Text", "Rating", "Complexity_Score"])  # Ensure correct columns
-
-@callback(
-    [Output("recipe-list", "children"),
-     Output("recipe-total", "children")],
-    [Input("rating-range", "value"),
-     Input("ingredient-checklist", "value")]
-)
-@cache.memoize()
-def update_recipe_list(rating_range=[0, 1], selected_ingredients=None): 
+# recipes and complexity
+def update_recipe_list(recipes, page=1, page_size=RECIPE_PAGE_SIZE):
     """
-    Updates the displayed list of recipes based on selected ingredients and rating range.
+    Renders one page of the filtered recipes. The response stays bounded by the page
+    size; each tooltip starts as a placeholder and is filled in by `load_recipe_tooltip`
+    when it is first shown.
     """
-    filtered_df = df_recipes.copy()
-
-    # Filter by rating range
-    filtered_df = filtered_df[
-        (filtered_df["Rating"] >= rating_range[0]) &
-        (filtered_df["Rating"] <= rating_range[1])
-    ]
-
-    # Filter by ingredient selection (if ingredients are selected)
-    if selected_ingredients:
-        filtered_df = filtered_df[filtered_df["Ingredient"].isin(selected_ingredients)]
-
-    recipe_count_text = f"Total Recipes: {filtered_df['Recipe_Index'].nunique()}"
+    recipe_count_text = f"Total Recipes: {len(recipes)}"
 
     # If no recipes match, show message
-    if filtered_df.empty:
+    if recipes.empty:
         return [html.P("No recipes match the selected criteria.", style={"color": "red", "textAlign": "center"})], recipe_count_text
 
-    # **Group by Recipe_Index and Complexity_Score, concatenate ingredient descriptions**
-    grouped_recipes = (
-        filtered_df.groupby(["Recipe_Index", "Complexity_Score"])[["Quantity", "Unit", "Ingredient"]]
-        .apply(lambda df: "\n".join([f"{round(qty, 1)} {unit} {ing}" for qty, unit, ing in zip(df["Quantity"], df["Unit"], df["Ingredient"])]))
-        .reset_index()
-        .rename(columns={0: "Formatted_Ingredients"})
-    )
-    grouped_recipes["Numeric_Index"] = (
-        grouped_recipes["Recipe_Index"]
-        .str.extract(r"(\d+)")    
-        .astype(int)              
-    )
-    grouped_recipes = grouped_recipes.sort_values("Numeric_Index")
-
+    page_recipes = recipes.iloc[(page - 1) * page_size:page * page_size]
 
-    # Display filtered recipes with tooltips for full ingredient descriptions
+    # Display the page of recipes with tooltips for full ingredient descriptions
     recipe_list = []
-    for _, row in grouped_recipes.iterrows():
-        recipe_id = f"recipe-{row['Recipe_Index']}"  # Unique ID for each list item
-
-        # Create tooltip text with all ingredients
-        tooltip_text = f"Ingredients:\n{row['Formatted_Ingredients']}"
+    for recipe_index, complexity_score in zip(page_recipes["Recipe_Index"], page_recipes["Complexity_Score"]):
+        recipe_id = {"type": "recipe-item", "index": recipe_index}  # Unique ID for each list item
 
         # Create list item with Recipe Index and Complexity Score
         recipe_list.append(
             html.Li(
                 [
-                    html.Span(f"{row['Recipe_Index']}", style={"flex": "1", "textAlign": "left"}),
-                    html.Span(f"{row['Complexity_Score']:.2f}", style={"textAlign": "right", "minWidth": "50px"})
+                    html.Span(f"{recipe_index}", style={"flex": "1", "textAlign": "left"}),
+                    html.Span(f"{complexity_score:.2f}", style={"textAlign": "right", "minWidth": "50px"})
                 ],
                 id=recipe_id,
                 style={
@@ -393,14 +494,15 @@ def update_recipe_list(rating_range=[0, 1], selected_ingredients=None):
             )
         )
 
-        # Add tooltip with **ALL ingredients**
+        # Add tooltip, loaded with **ALL ingredients** when first shown
         recipe_list.append(
             dbc.Tooltip(
-                tooltip_text,  # Tooltip contains ingredient list
+                TOOLTIP_PLACEHOLDER,
+                id={"type": "recipe-tooltip", "index": recipe_index},
                 target=recipe_id,
                 placement="right",
                 style={"color": "#000", "maxWidth": "300px", "whiteSpace": "pre-wrap"}  # pre-wrap ensures new lines are visible
             )
         )
 
-    return recipe_list, recipe_count_text
\ No newline at end of file
+    return recipe_list, recipe_count_text
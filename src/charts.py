@@ -0,0 +1,150 @@
+# charts.py
+#
+# Skeletons of the dashboard charts (the Vega-Lite specs and the Plotly gauge figure)
+# and the partial updates filling them in.
+#
+# The layout starts from the skeletons. On a filter change the callbacks only send what
+# depends on the filters: the rows of the Vega-Lite charts (a named dataset of the spec)
+# and a few values (the histogram's x domain, the gauge's value). An update is a list of
+# (path, value) pairs into the spec or figure; `as_patch` turns it into a Dash Patch, a
+# partial property update applied in the browser.
+#
+# The skeletons are written as the plain dicts the browser receives, not built with
+# Altair and plotly.graph_objects: the app never imports either library, so building
+# the layout (in the gunicorn master, see wsgi.py) does not pay for them.
+
+from dash import Patch
+
+# names of the datasets of the Vega-Lite specs, filled in by the updates
+HISTOGRAM_DATA = "bins"
+BAR_CHART_DATA = "ingredients"
+
+VEGA_LITE_SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+
+# chart colors
+BACKGROUND = "#F5E1C8"
+BAR_COLOR = "#906A51"
+AXIS_COLOR = "#3E2723"
+GRID_COLOR = "#D2A679"
+
+
+def histogram_template() -> dict:
+    """
+    Returns the Vega-Lite spec of the rating histogram, with no bins and the full rating range.
+    """
+    return {
+        "$schema": VEGA_LITE_SCHEMA,
+        "data": {"name": HISTOGRAM_DATA},
+        "datasets": {HISTOGRAM_DATA: []},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {
+                "field": "bin_start", "type": "quantitative", "bin": "binned",
+                "title": "Rating",
+                "scale": {"domain": [0, 1]},
+                "axis": {"domainColor": AXIS_COLOR, "tickColor": AXIS_COLOR},
+            },
+            "x2": {"field": "bin_end"},
+            "y": {
+                "field": "count", "type": "quantitative",
+                "title": "Count",
+                "axis": {"gridColor": GRID_COLOR, "domainColor": AXIS_COLOR, "tickColor": AXIS_COLOR},
+            },
+            "tooltip": [{"field": "count", "type": "quantitative", "title": "Number of Recipes"}],
+            "color": {"value": BAR_COLOR},
+        },
+        "width": "container",
+        "height": "container",
+        "config": {"background": BACKGROUND, "view": {"strokeWidth": 0}},
+    }
+
+
+def bar_chart_template() -> dict:
+    """
+    Returns the Vega-Lite spec of the top ingredients bar chart, with no bars.
+    """
+    return {
+        "$schema": VEGA_LITE_SCHEMA,
+        "data": {"name": BAR_CHART_DATA},
+        "datasets": {BAR_CHART_DATA: []},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {
+                "field": "Recipe_Count", "type": "quantitative",
+                "title": "Number of Recipes",
+                "axis": {"gridColor": GRID_COLOR, "domainColor": AXIS_COLOR, "tickColor": AXIS_COLOR},
+            },
+            "y": {
+                "field": "Ingredient", "type": "nominal",
+                "sort": "-x",
+                "title": "Ingredient",
+                "axis": {"domainColor": AXIS_COLOR, "tickColor": AXIS_COLOR},
+            },
+            "tooltip": [{"field": "Recipe_Count", "type": "quantitative", "title": "Number of Recipes"}],
+            "color": {"value": BAR_COLOR},
+        },
+        "width": "container",
+        "height": {"step": 28},
+        "config": {
+            "background": BACKGROUND,
+            "view": {"strokeWidth": 0},
+            "axis": {"labelLimit": 0, "labelFontSize": 10, "titleFontSize": 12},
+        },
+    }
+
+
+def gauge_template() -> dict:
+    """
+    Returns the Plotly gauge figure of the average rating, with the dial at 0.
+    """
+    # Plotly Gauge with a dynamically moving dial color (the steps follow the average)
+    return {
+        "data": [{
+            "type": "indicator",
+            "mode": "gauge+number",
+            "value": 0,
+            "domain": {"x": [0, 1], "y": [0, 1]},   # Fill the entire chart area (full circle)
+            "gauge": {
+                "axis": {
+                    "range": [0, 1],
+                    "tickmode": "linear",
+                    "tick0": 0,
+                    "dtick": 0.2,
+                    "tickfont": {"color": "#000", "size": 12}
+                },
+                "bar": {"color": AXIS_COLOR, "thickness": 0.3},  # Ensure the dial color is distinct
+                "steps": [
+                    {"range": [0, 0], "color": BAR_COLOR},  # Color up to average rating
+                    {"range": [0, 1], "color": BACKGROUND},  # Remaining range
+                ],
+                "threshold": {
+                    "line": {"color": AXIS_COLOR, "width": 4},
+                    "thickness": 0.75,  # Adjusted for a clear marker
+                    "value": 0
+                },
+                "borderwidth": 0,
+                "bordercolor": GRID_COLOR,
+            }
+        }],
+        # Adjust layout to fit the small container
+        "layout": {
+            "autosize": True,
+            "margin": {"l": 5, "r": 5, "t": 35, "b": 5},
+            "paper_bgcolor": GRID_COLOR,  # Match outer container
+            "font": {"color": "#000"}
+        },
+    }
+
+
+def as_patch(updates) -> Patch:
+    """
+    Returns a Dash Patch setting each path of `updates` (a list of (path, value) pairs)
+    to its value, leaving the rest of the property as it is in the browser.
+    """
+    patch = Patch()
+    for path, value in updates:
+        target = patch
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = value
+    return patch
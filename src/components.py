@@ -1,6 +1,8 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 import dash_vega_components as dvc
+from .charts import bar_chart_template, gauge_template, histogram_template
+from .filters import RATING_STEP
 
 def header():
     return html.Header(
@@ -202,6 +204,19 @@ def ingredient_filter():
                                     )
                                 ]
                             ),
+                            # Whether recipes must contain any or all of the selected ingredients
+                            dcc.RadioItems(
+                                id="ingredient-match-mode",
+                                options=[
+                                    {"label": "Any selected", "value": "any"},
+                                    {"label": "All selected", "value": "all"}
+                                ],
+                                value="any",
+                                inline=True,
+                                labelStyle={"marginRight": "15px"},
+                                inputStyle={"marginRight": "5px"},
+                                style={"marginTop": "10px"}
+                            ),
                             # Header row for columns
                             html.Div(
                                 children=[
@@ -253,14 +268,14 @@ def distribution_recipe_ratings():
         children=[
             html.H6("Distribution of Recipe Ratings", style={'color':'black', "textAlign": "center"}),
             dvc.Vega(id='rating_histogram',
-                     spec={},
+                     spec=histogram_template(),
                      style={"width": "100%", "height": "70%"}),
             dcc.RangeSlider(
                 id='rating-range',
                 min=0,
                 max=1,
                 value=[0, 1],
-                step=0.1,
+                step=RATING_STEP,
                 marks={i: {'label': str(i), 'style': {'color': 'black'}} for i in [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]},
                 className="rating-slider",
             )
@@ -290,6 +305,7 @@ def average_rating():
             html.H6("Average Rating:", style={'color':'black', "textAlign": "center"}),
             dcc.Graph(
                 id="rating_gauge",
+                figure=gauge_template(),
                 config={"displayModeBar": False},  # Hide toolbar
                 style={
                     "width": "80%",   # Dynamic chart width
@@ -330,7 +346,7 @@ def number_of_recipes_per_ingredient():
             html.Div(
                 dvc.Vega(
                     id='ingredient_bar_chart',
-                    spec={},
+                    spec=bar_chart_template(),
                     style={"width": "100%", "height": "35%"},  
                 ),
                 style={
@@ -393,17 +409,28 @@ def recipes_and_complexity():
             html.P(id="recipe-total", children="Total Recipes: 0",
                    style={"textAlign": "center", "color": "#000", "marginBottom": "10px"}),
 
-            # Container for recipe list
+            # Container for recipe list (one page at a time)
             html.Ul(
                 id="recipe-list", style={
                 "listStyleType": "none",
                 "padding": "10px",
-                "height": "80%",
+                "height": "72%",
                 "overflowY": "auto",
                 "backgroundColor": "#F5E1C8",
                 "textAlign": "left",
                 "fontSize": "14px"
             }),
+
+            # Page selector for the recipe list
+            dbc.Pagination(
+                id="recipe-pagination",
+                min_value=1,
+                max_value=1,
+                active_page=1,
+                fully_expanded=False,
+                size="sm",
+                style={"justifyContent": "center"}
+            ),
         ],
         className="recipes_and_complexity",
         style={
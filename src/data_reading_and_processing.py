@@ -6,23 +6,231 @@
 # Then, it proccesses the raw data by generating the missing rating values.
 # It also engineers new features: ingredient category, ingredient subcategory, 
 # ingredient proportion, ingredient popularity score, and complexity score.
-# Also saves the processed data to data/processed/processed_cookie_data.csv.
+# Also saves the processed data to data/processed/processed_cookie_data.csv
+# and data/processed/processed_cookie_data.parquet, as a parquet dataset partitioned by subcategory to data/processed/processed_cookie_data/,
+# a recipe-level summary table to data/processed/processed_recipe_summaries.parquet
+# and a rating x ingredient aggregate cube to data/processed/processed_rating_cube.npz.
 
 # Usage from the project root:
 # python src/data_reading_and_processing.py
+# python src/data_reading_and_processing.py --source data/raw/mirror   (a URL, csv file or directory of csv files)
+# python src/data_reading_and_processing.py --incremental   (only reprocess new or changed recipes)
+# python src/data_reading_and_processing.py --stream data/raw/raw_cookie_data.csv   (bounded memory)
 
+import numpy as np
 import pandas as pd
-import requests
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import argparse
+import hashlib
 import io
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter
 
-def read_data() -> pd.DataFrame:
+# Raw data sources
+#
+# A source returns the raw csv as a list of (name, bytes) parts (one per file), or None
+# when it can tell that nothing changed since the validators it returned last time
+# (HTTP ETag / Last-Modified, file modification times and sizes). The content hash of
+# the parts and the validators of the last processed data are kept in SOURCE_STATE,
+# so a scheduled run whose raw data did not change stops before any processing.
+
+DEFAULT_URL = "https://raw.githubusercontent.com/the-pudding/data/master/cookies/choc_chip_cookie_ingredients.csv"
+
+# local copy of the last download from DEFAULT_URL (usable as a source when offline)
+MIRROR_PATH = "data/raw/mirror/choc_chip_cookie_ingredients.csv"
+
+SOURCE_STATE = "data/processed/source_state.json"
+
+# copy of the raw data of the last run, as parsed
+RAW_COPY = "data/raw/raw_cookie_data.csv"
+
+# files written by a run; the run is redone if one of them is missing
+PROCESSED_OUTPUTS = [
+    "data/processed/processed_cookie_data",
+    "data/processed/processed_recipe_summaries.parquet",
+    "data/processed/processed_rating_cube.npz",
+]
+
+class UrlSource:
+    """
+    Raw csv served over HTTP(S), fetched with conditional requests and mirrored locally.
+    """
+
+    def __init__(self, url: str, timeout: float = 30, mirror: str = None):
+        self.url = url
+        self.timeout = timeout
+        self.mirror = mirror
+
+    def __str__(self):
+        return self.url
+
+    def fetch(self, validators: dict = None):
+        # imported here: only URL sources need it, and the web app imports this module
+        import requests
+
+        validators = validators or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            response = requests.get(self.url, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Error fetching data from {self.url}: {e}") from e
+
+        if response.status_code == 304:
+            return None, validators
+
+        if self.mirror:
+            os.makedirs(os.path.dirname(self.mirror), exist_ok=True)
+            with open(self.mirror, "wb") as f:
+                f.write(response.content)
+
+        return [(self.url, response.content)], {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+class FileSource:
+    """
+    Raw csv in a local file; unchanged if its modification time and size are.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __str__(self):
+        return self.path
+
+    def _validators(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            raise ValueError(f"Error reading data from {self.path}: {e}") from e
+        return {"files": {os.path.basename(self.path): [stat.st_mtime_ns, stat.st_size]}}
+
+    def fetch(self, validators: dict = None):
+        current = self._validators()
+        if validators and validators.get("files") == current["files"]:
+            return None, current
+        with open(self.path, "rb") as f:
+            return [(os.path.basename(self.path), f.read())], current
+
+class DirectorySource:
+    """
+    Raw csv split over the `*.csv` files of a local directory (read in name order);
+    unchanged if the set of files and their modification times and sizes are.
+    """
+
+    def __init__(self, path: str, pattern: str = ".csv"):
+        self.path = path
+        self.pattern = pattern
+
+    def __str__(self):
+        return self.path
+
+    def _files(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith(self.pattern))
+
+    def fetch(self, validators: dict = None):
+        files = self._files()
+        if not files:
+            raise ValueError(f"No {self.pattern} files in {self.path}")
+        current = {"files": {}}
+        for name in files:
+            stat = os.stat(os.path.join(self.path, name))
+            current["files"][name] = [stat.st_mtime_ns, stat.st_size]
+        if validators and validators.get("files") == current["files"]:
+            return None, current
+
+        parts = []
+        for name in files:
+            with open(os.path.join(self.path, name), "rb") as f:
+                parts.append((name, f.read()))
+        return parts, current
+
+def make_source(spec: str = None):
+    """
+    Returns the source for `spec`: an http(s) URL, a directory of csv files or a csv file.
+    Defaults to DEFAULT_URL, mirrored to MIRROR_PATH.
+    """
+    if spec is None or spec == DEFAULT_URL:
+        return UrlSource(DEFAULT_URL, mirror=MIRROR_PATH)
+    if spec.startswith(("http://", "https://")):
+        return UrlSource(spec)
+    if os.path.isdir(spec):
+        return DirectorySource(spec)
+    return FileSource(spec)
+
+def _reads_path(source, path: str) -> bool:
     """
-    Reads data from a predefined URL into a Pandas DataFrame.
+    Returns whether `source` reads the file at `path`. Such a file must not be rewritten
+    by the run: its new modification time would not match the validators, and its new
+    content (the parsed data written back) would not match the content hash.
+    """
+    if isinstance(source, FileSource):
+        return os.path.abspath(source.path) == os.path.abspath(path)
+    if isinstance(source, DirectorySource):
+        return (os.path.abspath(source.path) == os.path.abspath(os.path.dirname(path))
+                and path.endswith(source.pattern))
+    return False
+
+def content_hash(parts: list) -> str:
+    """
+    Returns the sha256 of the raw data parts (for a single file, the hash of its bytes).
+    """
+    digest = hashlib.sha256()
+    for i, (name, content) in enumerate(parts):
+        if len(parts) > 1:
+            digest.update(f"{i}:{name}:{len(content)}\n".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+def parse_raw_data(parts: list) -> pd.DataFrame:
+    """
+    Parses the raw csv parts of a source into one DataFrame.
+    """
+    try:
+        frames = [pd.read_csv(io.BytesIO(content), index_col=0) for _, content in parts]
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Error parsing data: {e}") from e
+    return frames[0] if len(frames) == 1 else pd.concat(frames)
+
+def load_source_state(path: str = SOURCE_STATE) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_source_state(state: dict, path: str = SOURCE_STATE):
+    with open(path, "w") as f:
+        json.dump(state, f)
+
+def read_data(source=None) -> pd.DataFrame:
+    """
+    Reads the raw data from a source into a Pandas DataFrame.
+
+    Parameters:
+    -----------
+    source : str or source, optional
+        A URL, a csv file or a directory of csv files (see make_source), or a source
+        object. Defaults to the cookie recipes published by The Pudding.
 
     Returns:
     --------
     pd.DataFrame
-        A DataFrame containing the data from the specified URL.
+        A DataFrame containing the data from the source.
 
     Raises:
     -------
@@ -34,16 +242,10 @@ def read_data() -> pd.DataFrame:
     >>> df = read_data()
     >>> print(df.head())
     """
-    url = "https://raw.githubusercontent.com/the-pudding/data/master/cookies/choc_chip_cookie_ingredients.csv"
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        df = pd.read_csv(io.StringIO(response.text), index_col=0)        
-        return df
-    
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data: {e}")
+    if source is None or isinstance(source, str):
+        source = make_source(source)
+    parts, _ = source.fetch()
+    return parse_raw_data(parts)
 
 def sub_categorize_ingredient(ingredient, flour_types, sweetener_types, fat_types, chocolate_types):
     """
@@ -142,48 +344,79 @@ def categorize_subcategory(subcategory):
     elif subcategory in special_categories:
         return "special"
 
-def engineer_categories_and_subcategories(raw_data):
+# Subcategory rules, checked in order (the first matching rule wins), equivalent to
+# sub_categorize_ingredient with the ingredient lists built from the data:
+# "contains" rules match ingredients containing any of the values, "equals" rules match exactly.
+SUBCATEGORY_RULES = [
+    ("flour", "contains", ["flour"]),
+    ("sweetener", "contains", ["sugar"]),
+    ("sweetener", "equals", ["corn syrup", "honey", "molasses", "applesauce"]),
+    ("fat", "equals", ["butter", "margarine", "shortening", "vegetable oil"]),
+    ("egg", "equals", ["egg"]),
+    ("chocolate", "contains", ["chocolate"]),
+]
+
+# category of each subcategory, as in categorize_subcategory
+SUBCATEGORY_CATEGORIES = {
+    "flour": "basic", "sweetener": "basic", "fat": "basic", "egg": "basic",
+    "chocolate": "special", "other": "special",
+}
+
+def categorize_ingredients(ingredients: pd.Series) -> pd.DataFrame:
     """
-    Engineers the features: ingredient category and subcategory.
-    Returns a pandas dataframe with the new features.
+    Categorizes a set of distinct ingredients with the rule table SUBCATEGORY_RULES.
+
+    Parameters
+    ----------
+    ingredients : pd.Series
+        Distinct ingredient names.
+
+    Returns
+    -------
+    pd.DataFrame
+        The columns 'subcategory' and 'category', aligned with `ingredients`.
+
+    Examples
+    --------
+    >>> categorize_ingredients(pd.Series(["all purpose flour", "honey", "vanilla extract"]))
     """
-    # get array of unique ingredients in raw_data
-    unique_ingredients = raw_data["Ingredient"].unique()
+    names = ingredients.astype(str)
+    subcategory = np.full(len(names), "other", dtype=object)
+    assigned = np.zeros(len(names), dtype=bool)
 
-    # get list of flour types in raw_data
-    flour_types = []
-    for i in unique_ingredients:
-        if "flour" in i:
-            flour_types.append(i)
+    for subcat, match, values in SUBCATEGORY_RULES:
+        if match == "contains":
+            hit = names.str.contains("|".join(re.escape(value) for value in values), regex=True).to_numpy()
+        else:
+            hit = names.isin(values).to_numpy()
+        hit &= ~assigned
+        subcategory[hit] = subcat
+        assigned |= hit
 
-    # get list of sugar types in raw_data
-    sugar_types = []
-    for i in unique_ingredients:
-        if "sugar" in i:
-            sugar_types.append(i)
-    
-    # define a list of sweetener types
-    sweetener_types = sugar_types + ["corn syrup", "honey", "molasses", "applesauce"]
+    subcategory = pd.Series(subcategory, index=ingredients.index)
+    return pd.DataFrame({"subcategory": subcategory, "category": subcategory.map(SUBCATEGORY_CATEGORIES)})
 
-    # define a list of fat_types
-    fat_types = ["butter", "margarine", "shortening", "vegetable oil"]
+def engineer_categories_and_subcategories(raw_data):
+    """
+    Engineers the features: ingredient category and subcategory.
+    Returns a pandas dataframe with the new features.
 
-    # get list of chocolate types in raw_data
-    chocolate_types = []
-    for i in unique_ingredients:
-        if "chocolate" in i:
-            chocolate_types.append(i)
-    
-    data_with_categories_and_subcategories = raw_data.copy()
+    Each distinct ingredient is categorized once (see categorize_ingredients) and the
+    result is mapped back to the rows through the ingredient codes, so the cost grows
+    with the number of distinct ingredients rather than the number of rows.
+    """
+    # categorize the unique ingredients in raw_data
+    codes, unique_ingredients = pd.factorize(raw_data["Ingredient"])
+    categories = categorize_ingredients(pd.Series(unique_ingredients))
 
-    # create subcategory column
-    data_with_categories_and_subcategories["subcategory"] = data_with_categories_and_subcategories["Ingredient"].apply(
-        sub_categorize_ingredient,
-        args=(flour_types, sweetener_types, fat_types, chocolate_types)
-        )
+    data_with_categories_and_subcategories = raw_data.copy()
 
-    # create category column
-    data_with_categories_and_subcategories["category"] = data_with_categories_and_subcategories["subcategory"].apply(categorize_subcategory)
+    # map back to the rows (code -1 marks a missing ingredient, which gets no category)
+    missing = codes < 0
+    for col in ["subcategory", "category"]:
+        values = categories[col].to_numpy()[codes] if len(categories) else np.full(len(codes), None, dtype=object)
+        values[missing] = None
+        data_with_categories_and_subcategories[col] = values
 
     return data_with_categories_and_subcategories
 
@@ -288,20 +521,217 @@ def calculate_complexity_score(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def main():
+def _recipe_ingredient_pairs(df: pd.DataFrame) -> pd.DataFrame:
+    return df[["Recipe_Index", "Ingredient"]].dropna().astype(str).drop_duplicates()
+
+def build_recipe_summaries(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Reads in the raw data from the web and saves it to data/raw/raw_cookie_data.csv.
-    Proccesses the raw data by generating the missing rating values.
-    Engineers new features: ingredient category, ingredient subcategory, 
-    ingredient proportion, ingredient popularity score, and complexity score.
-    Saves the processed data to data/processed/processed_cookie_data.csv.
+    Builds a recipe-level table with everything the recipe list displays, so the
+    dashboard only has to select rows from it.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The processed data with one row per recipe ingredient.
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per recipe with the columns 'Recipe_Index', 'Rating', 'Complexity_Score',
+        'Formatted_Ingredients' (one "quantity unit ingredient" line per ingredient),
+        'Source' (the prefix of the recipe index) and 'Numeric_Index' (its numeric part),
+        sorted by 'Numeric_Index'.
+
+    Example:
+    --------
+    >>> data = {'Recipe_Index': ['AR_2', 'AR_2', 'E_1'], 'Ingredient': ['flour', 'sugar', 'butter'],
+    ...         'Quantity': [2.0, 1.0, 0.5], 'Unit': ['cup', 'cup', 'cup'],
+    ...         'Rating': [0.9, 0.9, 0.7], 'Complexity_Score': [0.5, 0.5, 0.0]}
+    >>> print(build_recipe_summaries(pd.DataFrame(data)))
+    """
+    lines = (
+        df["Quantity"].astype(float).round(1).astype(str) + " "
+        + df["Unit"].astype(str) + " "
+        + df["Ingredient"].astype(str)
+    )
+    recipe_index = df["Recipe_Index"].astype(str)
+
+    summaries = (
+        pd.DataFrame({
+            "Recipe_Index": recipe_index,
+            "Rating": df["Rating"],
+            "Complexity_Score": df["Complexity_Score"].fillna(0),
+            "Formatted_Ingredients": lines,
+        })
+        .groupby("Recipe_Index", sort=True)
+        .agg({"Rating": "mean", "Complexity_Score": "first", "Formatted_Ingredients": "\n".join})
+        .reset_index()
+    )
+    summaries["Source"] = summaries["Recipe_Index"].str.extract(r"^(.*?)_", expand=False)
+    summaries["Numeric_Index"] = summaries["Recipe_Index"].str.extract(r"(\d+)", expand=False).astype("int32")
+
+    return summaries.sort_values("Numeric_Index", kind="stable").reset_index(drop=True)
+
+def build_rating_cube(df: pd.DataFrame, step: float = 0.1, low: float = 0.0, high: float = 1.0) -> dict:
+    """
+    Precomputes recipe counts and rating sums per (rating bin, ingredient), with
+    cumulative sums along the rating axis, so that the dashboard can answer a
+    rating-range query with two lookups per ingredient.
+
+    The rating axis is cut at the rating-slider positions `edges` (low, low + step, ..., high).
+    Bin 2k holds the ratings strictly between edges[k - 1] and edges[k], bin 2k + 1 the
+    ratings equal to edges[k] and the last bin the ratings above `high`, so the
+    inclusive range [edges[a], edges[b]] is exactly the bins 2a + 1 to 2b + 1.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The processed data with one row per recipe ingredient.
+    step, low, high : float
+        The step and bounds of the rating slider.
+
+    Returns:
+    --------
+    dict of np.ndarray
+        'edges', 'ingredients' (sorted), 'cum_counts' and 'cum_sums' of shape
+        (number of bins + 1, number of ingredients + 1), where row b holds the totals
+        of bins < b and the last column covers all recipes, plus 'sorted_ratings' and
+        'sorted_recipes': the recipe ratings in ascending order and their recipe indexes.
+
+    Example:
+    --------
+    >>> data = {'Recipe_Index': ['R1', 'R1', 'R2'], 'Ingredient': ['flour', 'sugar', 'flour'], 'Rating': [0.9, 0.9, 0.5]}
+    >>> cube = build_rating_cube(pd.DataFrame(data))
+    >>> print(cube['cum_counts'][-1])
     """
-    # read data from web
-    raw_data = read_data()
+    edges = rating_cube_edges(step, low, high)
+    ingredients = pd.Index(np.sort(_recipe_ingredient_pairs(df)["Ingredient"].unique()))
+    counts, sums, recipe_ratings = count_rating_cube(df, edges, ingredients)
+    return finish_rating_cube(edges, ingredients, counts, sums, recipe_ratings)
 
-    # save raw data to csv
-    raw_data.to_csv("data/raw/raw_cookie_data.csv")
+def rating_cube_edges(step: float = 0.1, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+    """
+    Returns the rating-slider positions (low, low + step, ..., high) that cut the rating axis of the cube.
+    """
+    n_edges = round((high - low) / step) + 1
+    return np.round(low + np.arange(n_edges) * step, 10)
+
+def count_rating_cube(df: pd.DataFrame, edges: np.ndarray, ingredients: pd.Index) -> tuple:
+    """
+    Counts the recipes and sums their ratings per (rating bin, ingredient), without the
+    cumulative sums, so that the totals of disjoint sets of recipes can be added up.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Processed data holding all the rows of each of its recipes.
+    edges : np.ndarray
+        The rating-slider positions (see rating_cube_edges).
+    ingredients : pd.Index
+        The sorted ingredients of the whole corpus (the columns of the cube).
 
+    Returns:
+    --------
+    tuple
+        (counts, sums, recipe_ratings): two arrays of shape (number of bins, number of
+        ingredients + 1) and the rating of each recipe of `df`.
+    """
+    # one rating per recipe
+    recipe_ratings = (
+        df.assign(Recipe_Index=df["Recipe_Index"].astype(str))
+        .groupby("Recipe_Index")["Rating"].mean()
+        .dropna()
+    )
+    ratings = recipe_ratings.to_numpy(dtype=float)
+
+    n_edges = len(edges)
+    n_bins = 2 * n_edges + 1
+
+    left = np.searchsorted(edges, ratings, side="left")
+    exact = edges[np.minimum(left, n_edges - 1)] == ratings
+    recipe_bins = 2 * left + exact
+
+    # (recipe, ingredient) membership
+    pairs = _recipe_ingredient_pairs(df)
+    ingredient_codes = ingredients.get_indexer(pairs["Ingredient"])
+    recipe_pos = recipe_ratings.index.get_indexer(pairs["Recipe_Index"])
+    keep = (recipe_pos >= 0) & (ingredient_codes >= 0)
+    ingredient_codes, recipe_pos = ingredient_codes[keep], recipe_pos[keep]
+
+    counts = np.zeros((n_bins, len(ingredients) + 1), dtype=np.int64)
+    sums = np.zeros((n_bins, len(ingredients) + 1), dtype=np.float64)
+    np.add.at(counts, (recipe_bins[recipe_pos], ingredient_codes), 1)
+    np.add.at(sums, (recipe_bins[recipe_pos], ingredient_codes), ratings[recipe_pos])
+    counts[:, -1] = np.bincount(recipe_bins, minlength=n_bins)
+    sums[:, -1] = np.bincount(recipe_bins, weights=ratings, minlength=n_bins)
+
+    return counts, sums, recipe_ratings
+
+def finish_rating_cube(edges, ingredients, counts, sums, recipe_ratings=None) -> dict:
+    """
+    Turns the totals of count_rating_cube into the arrays of build_rating_cube. Without
+    `recipe_ratings`, the rating-sorted recipe arrays are left to the caller.
+    """
+    cube = {
+        "edges": edges,
+        "ingredients": np.asarray(ingredients, dtype=str),
+        "cum_counts": np.vstack([np.zeros((1, counts.shape[1]), dtype=np.int64), counts.cumsum(axis=0)]),
+        "cum_sums": np.vstack([np.zeros((1, sums.shape[1])), sums.cumsum(axis=0)]),
+    }
+    if recipe_ratings is not None:
+        ratings = recipe_ratings.to_numpy(dtype=float)
+        order = np.argsort(ratings, kind="stable")
+        cube["sorted_ratings"] = ratings[order]
+        cube["sorted_recipes"] = recipe_ratings.index.to_numpy(dtype=str)[order]
+    return cube
+
+# columns stored dictionary-encoded (pandas categoricals)
+CATEGORICAL_COLUMNS = ["Recipe_Index", "Ingredient", "Unit", "subcategory", "category"]
+
+# numeric columns stored as float32; Rating stays float64 so that slider bounds compare exactly
+FLOAT32_COLUMNS = ["Quantity", "Ingredient_Proportion", "Popularity_Score", "Complexity_Score"]
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the processed data to a compact in-memory representation.
+
+    String columns become categoricals (so memory scales with the number of
+    distinct values rather than the number of rows) and scores become float32.
+    Columns that are not present are left out.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The processed recipe data.
+
+    Returns:
+    --------
+    pd.DataFrame
+        A compact copy of the data.
+
+    Example:
+    --------
+    >>> data = {'Recipe_Index': ['R1', 'R1', 'R2'], 'Ingredient': ['flour', 'sugar', 'flour'], 'Quantity': [2.0, 1.0, 3.0]}
+    >>> df = compact_dtypes(pd.DataFrame(data))
+    >>> print(df.dtypes)
+    """
+    df = df.copy()
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+
+    return df
+
+def process_raw_data(raw_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runs the full feature engineering on the raw data: ingredient category and
+    subcategory, ingredient proportion, ingredient popularity score and complexity score.
+    """
     # Engineer ingredient categories and subcategories
     processed_data = engineer_categories_and_subcategories(raw_data)
 
@@ -314,11 +744,753 @@ def main():
     # Compute complexity score using the 'Text' column
     processed_data = calculate_complexity_score(processed_data)
 
+    return processed_data
+
+# Partitioned layout of the processed data: one directory per subcategory (hive style,
+# e.g. subcategory=chocolate/), rows sorted by rating inside each file and row groups of
+# ROW_GROUP_ROWS rows, so that the min/max statistics of each row group cover a narrow
+# rating range and readers can skip the row groups and partitions a filter excludes.
+PARTITION_COLUMNS = ["subcategory"]
+ROW_GROUP_ROWS = 4096
+
+def _arrow_schema(table):
+    """
+    Returns the schema of `table`, with all-null columns typed as strings.
+    """
+    fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+def write_processed_dataset(df: pd.DataFrame, path: str, basename_template: str = "part-{i}.parquet", schema=None):
+    """
+    Writes processed data into the partitioned parquet dataset at `path`.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The processed data.
+    path : str
+        The dataset directory. Files are added to it (existing files with other names are kept).
+    basename_template : str
+        The file name template of the written files ('{i}' is replaced by a counter).
+    schema : pa.Schema, optional
+        The schema of the files already in the dataset, so that every file matches.
+
+    Returns:
+    --------
+    pa.Schema
+        The schema of the written files.
+    """
+    # strings are stored plain (dictionary-encoded by parquet)
+    df = compact_dtypes(df)
+    df = df.astype({col: object for col in CATEGORICAL_COLUMNS if col in df.columns})
+    df = df.sort_values(["Rating", "Recipe_Index"], kind="stable", na_position="last")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema = schema or _arrow_schema(table)
+
+    file_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        table.select(schema.names).cast(schema), path,
+        format=file_format,
+        partitioning=ds.partitioning(pa.schema([schema.field(col) for col in PARTITION_COLUMNS]), flavor="hive"),
+        basename_template=basename_template,
+        max_rows_per_group=ROW_GROUP_ROWS,
+        file_options=file_format.make_write_options(write_statistics=True),
+        existing_data_behavior="overwrite_or_ignore",
+        # keeps the rating order of the rows within each file
+        use_threads=False,
+    )
+    return schema
+
+def _publish_dataset(staging: str, path: str):
+    """
+    Replaces the dataset at `path` with the one written to `staging`.
+    """
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(staging, path)
+
+def save_processed_data(processed_data: pd.DataFrame):
+    """
+    Saves the processed data (csv and partitioned parquet), the recipe summaries and the
+    rating x ingredient aggregate cube to data/processed/.
+    """
     # Save processed data a csv file
-    processed_data.to_csv("data/processed/processed_cookie_data.csv")
+    processed_data.to_csv(PROCESSED_CSV)
 
     # Save the processed data as a parquet file
-    processed_data.to_parquet("data/processed/processed_cookie_data.parquet")
+    processed_data.to_parquet(PROCESSED_SNAPSHOT)
+
+    # Save the processed data as a parquet dataset partitioned by subcategory, sorted by rating
+    staging = PROCESSED_DATASET + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    write_processed_dataset(processed_data, staging)
+    _publish_dataset(staging, PROCESSED_DATASET)
+
+    # Save the recipe-level summaries (one row per recipe) used by the recipe list
+    build_recipe_summaries(processed_data).to_parquet(RECIPE_SUMMARIES)
+
+    # Save the rating x ingredient aggregate cube used by the charts
+    np.savez(RATING_CUBE, **build_rating_cube(processed_data))
+
+# Incremental processing
+#
+# The ingest state saved next to the processed data records a hash of the raw rows of
+# every recipe and the counters behind the corpus-wide normalizations:
+# the number of recipes per ingredient (popularity) and the number of unique
+# ingredients per recipe together with how many recipes have each size (complexity).
+# It also records the partitions (subcategories) holding the rows of each recipe.
+# An incremental run only engineers the features of new or changed recipes, updates
+# the counters by the delta and re-applies the min/max normalizations from them. It
+# reads and rewrites only the partitions holding rows of changed or removed recipes
+# (all of them when a min/max bound moves), replaces their rows of the recipe summaries
+# and adds the delta's contribution to the rating cube (less that of the old rows),
+# so a small change costs I/O in proportion to the recipes it touches. The single-file
+# copies of the processed data would cost a full rewrite, so an incremental run removes
+# them instead of leaving them stale.
+#
+# The ingest state describes the outputs only once they are all written: every run
+# removes it before writing any output and saves the new one last, so a run interrupted
+# in between leaves no state, and the next run is a full one instead of applying a delta
+# to counters that do not match the outputs anymore.
+
+PROCESSED_DATASET = "data/processed/processed_cookie_data"
+# single-file copies of the processed data, committed to the repository (the app falls
+# back to the parquet one when the partitioned dataset has not been generated); only full
+# runs write them
+PROCESSED_CSV = "data/processed/processed_cookie_data.csv"
+PROCESSED_SNAPSHOT = "data/processed/processed_cookie_data.parquet"
+RECIPE_SUMMARIES = "data/processed/processed_recipe_summaries.parquet"
+RATING_CUBE = "data/processed/processed_rating_cube.npz"
+INGEST_STATE = "data/processed/ingest_state.json"
+
+# raw columns that define the content of a recipe
+RAW_COLUMNS = ["Ingredient", "Text", "Recipe_Index", "Rating", "Quantity", "Unit"]
+
+def hash_recipes(raw_data: pd.DataFrame) -> pd.Series:
+    """
+    Hashes the raw rows of each recipe (independently of row order).
+
+    Returns:
+    --------
+    pd.Series
+        A hex digest per 'Recipe_Index'.
+    """
+    columns = [col for col in RAW_COLUMNS if col in raw_data.columns]
+    row_hashes = pd.util.hash_pandas_object(raw_data[columns].astype(str), index=False)
+    recipe_hashes = row_hashes.groupby(raw_data["Recipe_Index"].astype(str).to_numpy()).sum()
+    return recipe_hashes.map(lambda h: format(int(h), "016x"))
+
+def normalize_counts(counts: pd.Series) -> pd.Series:
+    """
+    Min-max normalizes counts to [0, 1], as in calculate_ingredient_popularity and calculate_complexity_score.
+    """
+    return (counts - counts.min()) / (counts.max() - counts.min())
+
+def _map_by_category(values: pd.Series, mapping: pd.Series) -> np.ndarray:
+    """
+    Maps a (possibly long) column through `mapping` once per distinct value, using categorical codes.
+    """
+    categorical = values.astype("category")
+    mapped = mapping.reindex(categorical.cat.categories.astype(str)).to_numpy(dtype=float)
+    codes = categorical.cat.codes.to_numpy()
+    return np.where(codes >= 0, mapped[codes], np.nan)
+
+def _normalization_bounds(ingredient_counts: Counter, size_counts: Counter) -> tuple:
+    """
+    Returns the min/max recipes per ingredient and unique ingredients per recipe, the
+    bounds of the popularity and complexity normalizations.
+    """
+    counts = ingredient_counts.values()
+    return (min(counts, default=None), max(counts, default=None),
+            min(size_counts, default=None), max(size_counts, default=None))
+
+def _partition_values(subcategories: pd.Series) -> set:
+    """
+    Returns the partitions (subcategories, None for the null partition) that rows fall into.
+    """
+    return {None if pd.isna(value) else value for value in subcategories.unique()}
+
+def _recipe_partitions(df: pd.DataFrame) -> dict:
+    """
+    Returns the partitions holding the rows of each recipe of `df`.
+    """
+    subcategories = df[PARTITION_COLUMNS[0]].astype(object)
+    partitions = pd.DataFrame({
+        "Recipe_Index": df["Recipe_Index"].astype(str),
+        "partition": subcategories.where(subcategories.notna(), None),
+    }).drop_duplicates()
+    return partitions.groupby("Recipe_Index")["partition"].agg(list).to_dict()
+
+def _partition_files(path: str) -> dict:
+    """
+    Returns the files of the dataset at `path`, by partition (None for the null partition).
+    """
+    files = {}
+    for fragment in ds.dataset(path, format="parquet", partitioning="hive").get_fragments():
+        value = ds.get_partition_keys(fragment.partition_expression).get(PARTITION_COLUMNS[0])
+        files.setdefault(value, []).append(fragment.path)
+    return files
+
+def _read_partitions(path: str, files: dict, values: set, schema) -> pd.DataFrame:
+    """
+    Reads the rows of the partitions `values` of the dataset at `path`.
+    """
+    paths = [file for value in values for file in files.get(value, [])]
+    if not paths:
+        return pd.DataFrame(columns=schema.names)
+    partitioning = ds.partitioning(pa.schema([schema.field(col) for col in PARTITION_COLUMNS]), flavor="hive")
+    dataset = ds.dataset(paths, schema=schema, format="parquet", partitioning=partitioning, partition_base_dir=path)
+    return dataset.to_table().to_pandas()
+
+def _replace_partitions(df: pd.DataFrame, path: str, values: set, schema):
+    """
+    Replaces the partitions `values` of the dataset at `path` with the rows of `df`
+    (partitions left without rows are removed). The new files are written to a staging
+    directory first and moved in one partition directory at a time.
+    """
+    staging = path + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    new_files = {}
+    if len(df):
+        write_processed_dataset(df, staging, schema=schema)
+        new_files = _partition_files(staging)
+    old_files = _partition_files(path)
+
+    for value in values:
+        for old_dir in {os.path.dirname(file) for file in old_files.get(value, [])}:
+            shutil.rmtree(old_dir)
+        for new_dir in {os.path.dirname(file) for file in new_files.get(value, [])}:
+            os.replace(new_dir, os.path.join(path, os.path.relpath(new_dir, staging)))
+    shutil.rmtree(staging, ignore_errors=True)
+
+def build_ingest_state(raw_data: pd.DataFrame, processed_data: pd.DataFrame) -> dict:
+    """
+    Builds the ingest state (recipe hashes and normalization counters) of a full run.
+    """
+    pairs = _recipe_ingredient_pairs(processed_data)
+    recipe_sizes = pairs.groupby("Recipe_Index")["Ingredient"].nunique()
+    return {
+        "recipe_hashes": hash_recipes(raw_data).to_dict(),
+        "ingredient_recipe_counts": pairs["Ingredient"].value_counts().to_dict(),
+        "recipe_sizes": recipe_sizes.to_dict(),
+        "size_counts": Counter(recipe_sizes.tolist()),
+        "recipe_partitions": _recipe_partitions(processed_data),
+    }
+
+def load_ingest_state(path: str = INGEST_STATE):
+    """
+    Reads the ingest state, or returns None if there is none yet.
+    """
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    state["size_counts"] = Counter({int(size): n for size, n in state["size_counts"].items()})
+    return state
+
+def save_ingest_state(state: dict, path: str = INGEST_STATE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({**state, "size_counts": {str(size): n for size, n in state["size_counts"].items()}}, f)
+    os.replace(tmp_path, path)
+
+def clear_ingest_state(path: str = INGEST_STATE):
+    """
+    Removes the ingest state, before the outputs it describes are rewritten.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+def process_incremental(raw_data: pd.DataFrame, state: dict, path: str = PROCESSED_DATASET):
+    """
+    Works out the update of the processed data for the new or changed recipes of `raw_data`.
+
+    Only the recipes whose raw rows changed (or that are new) go through categorization
+    and ingredient proportion, and recipes missing from `raw_data` are dropped. The
+    popularity and complexity counters are updated by the delta and the min/max
+    normalizations re-applied from them. Only the subcategory partitions holding rows
+    of changed or removed recipes are read and rescored, unless a normalization bound
+    moved: every score changes then, and so does every partition.
+
+    Parameters:
+    -----------
+    raw_data : pd.DataFrame
+        The incoming raw data.
+    state : dict
+        The ingest state saved with the processed data (see build_ingest_state).
+    path : str
+        The partitioned parquet dataset of the processed data.
+
+    Returns:
+    --------
+    tuple
+        (update, new ingest state), or (None, state) if no recipe changed. The update is
+        applied by save_incremental; it holds the rows of the rewritten partitions
+        ('partitions', 'partition_values' and their 'schema'), the processed rows of the
+        changed recipes ('incoming'), the previous rows of the changed and removed
+        recipes ('outgoing' and their ids in 'outgoing_recipes'), the sorted ingredients
+        of the updated corpus ('ingredients') and, when its bounds moved, the new
+        complexity score of every recipe ('complexity', None otherwise).
+    """
+    new_hashes = hash_recipes(raw_data)
+    old_hashes = pd.Series(state["recipe_hashes"], dtype=object)
+    changed = new_hashes.index[new_hashes.ne(old_hashes.reindex(new_hashes.index))]
+    removed = old_hashes.index.difference(new_hashes.index)
+    if len(changed) == 0 and len(removed) == 0:
+        return None, state
+    outgoing_recipes = changed.union(removed)
+
+    ingredient_counts = Counter(state["ingredient_recipe_counts"])
+    recipe_sizes = dict(state["recipe_sizes"])
+    size_counts = Counter(state["size_counts"])
+    recipe_partitions = dict(state["recipe_partitions"])
+    old_bounds = _normalization_bounds(ingredient_counts, size_counts)
+
+    # the previous rows of changed and removed recipes, from the partitions they are in
+    files = _partition_files(path)
+    schema = ds.dataset(path, format="parquet", partitioning="hive").schema.remove_metadata()
+    read_partitions = {value for recipe in outgoing_recipes for value in recipe_partitions.pop(recipe, [])}
+    previous = _read_partitions(path, files, read_partitions, schema)
+    outgoing_mask = previous["Recipe_Index"].astype(str).isin(outgoing_recipes).to_numpy()
+    outgoing = previous[outgoing_mask]
+
+    # take the outgoing versions of changed and removed recipes out of the counters
+    outgoing_pairs = _recipe_ingredient_pairs(outgoing)
+    ingredient_counts.subtract(outgoing_pairs["Ingredient"].value_counts().to_dict())
+    for recipe in outgoing_pairs["Recipe_Index"].unique():
+        size_counts[recipe_sizes.pop(recipe)] -= 1
+
+    # engineer the per-recipe features of the incoming recipes only
+    incoming = raw_data[raw_data["Recipe_Index"].astype(str).isin(changed).to_numpy()]
+    incoming = engineer_categories_and_subcategories(incoming)
+    incoming = calculate_ingredient_proportion(incoming)
+
+    incoming_pairs = _recipe_ingredient_pairs(incoming)
+    ingredient_counts.update(incoming_pairs["Ingredient"].value_counts().to_dict())
+    incoming_sizes = incoming_pairs.groupby("Recipe_Index")["Ingredient"].nunique()
+    recipe_sizes.update(incoming_sizes.to_dict())
+    size_counts.update(incoming_sizes.tolist())
+    recipe_partitions.update(_recipe_partitions(incoming))
+
+    # drop counters that reached zero
+    ingredient_counts = +ingredient_counts
+    size_counts = +size_counts
+
+    # the partitions to rewrite: every one if a normalization bound moved
+    partition_values = read_partitions | _partition_values(incoming["subcategory"])
+    rescored = _normalization_bounds(ingredient_counts, size_counts) != old_bounds
+    if rescored:
+        partition_values |= set(files)
+    previous = pd.concat([previous[~outgoing_mask],
+                          _read_partitions(path, files, partition_values - read_partitions, schema)])
+
+    partitions = pd.concat(
+        [previous.astype({col: object for col in CATEGORICAL_COLUMNS if col in previous.columns}), incoming],
+        ignore_index=True
+    )
+
+    # corpus-wide normalizations from the maintained counters
+    popularity = normalize_counts(pd.Series(ingredient_counts, dtype=float))
+    partitions["Popularity_Score"] = _map_by_category(partitions["Ingredient"], popularity)
+
+    min_size, max_size = min(size_counts), max(size_counts)
+    complexity = (pd.Series(recipe_sizes, dtype=float) - min_size) / (max_size - min_size)
+    partitions["Complexity_Score"] = _map_by_category(partitions["Recipe_Index"], complexity)
+
+    partitions = partitions[[col for col in schema.names if col in partitions.columns]]
+
+    update = {
+        "partitions": partitions,
+        "partition_values": partition_values,
+        "schema": schema,
+        "incoming": partitions.iloc[len(previous):],
+        "outgoing": outgoing,
+        "outgoing_recipes": outgoing_recipes,
+        "ingredients": pd.Index(np.sort(np.asarray(list(ingredient_counts), dtype=object))),
+        "complexity": complexity if rescored else None,
+    }
+    new_state = {
+        "recipe_hashes": new_hashes.to_dict(),
+        "ingredient_recipe_counts": dict(ingredient_counts),
+        "recipe_sizes": recipe_sizes,
+        "size_counts": size_counts,
+        "recipe_partitions": recipe_partitions,
+    }
+    return update, new_state
+
+def update_rating_cube(cube: dict, outgoing: pd.DataFrame, incoming: pd.DataFrame, ingredients: pd.Index) -> dict:
+    """
+    Updates a cube of build_rating_cube by the contribution of a delta: the recipes of
+    `outgoing` are taken out and those of `incoming` added.
+
+    Parameters:
+    -----------
+    cube : dict of np.ndarray
+        The arrays of build_rating_cube.
+    outgoing, incoming : pd.DataFrame
+        All the processed rows of the recipes taken out and of the recipes added.
+    ingredients : pd.Index
+        The sorted ingredients of the updated corpus (the columns of the updated cube).
+
+    Returns:
+    --------
+    dict of np.ndarray
+        The arrays of build_rating_cube for the updated corpus.
+    """
+    edges = cube["edges"]
+
+    # per-bin totals, with the ingredient columns moved onto the updated axis
+    # (the last column covers all recipes)
+    positions = pd.Index(cube["ingredients"]).get_indexer(ingredients)
+    kept = np.flatnonzero(positions >= 0)
+    totals = []
+    for cumulative in [cube["cum_counts"], cube["cum_sums"]]:
+        per_bin = np.diff(cumulative, axis=0)
+        moved = np.zeros((per_bin.shape[0], len(ingredients) + 1), dtype=per_bin.dtype)
+        moved[:, kept] = per_bin[:, positions[kept]]
+        moved[:, -1] = per_bin[:, -1]
+        totals.append(moved)
+    counts, sums = totals
+
+    out_counts, out_sums, out_ratings = count_rating_cube(outgoing, edges, ingredients)
+    in_counts, in_sums, in_ratings = count_rating_cube(incoming, edges, ingredients)
+    counts = counts - out_counts + in_counts
+    sums = sums - out_sums + in_sums
+
+    recipe_ratings = pd.Series(cube["sorted_ratings"], index=cube["sorted_recipes"])
+    recipe_ratings = pd.concat([recipe_ratings.drop(out_ratings.index, errors="ignore"), in_ratings]).sort_index()
+
+    return finish_rating_cube(edges, ingredients, counts, sums, recipe_ratings)
+
+def save_incremental(update: dict):
+    """
+    Applies an update of process_incremental to the saved outputs: rewrites the affected
+    partitions of the parquet dataset, replaces the summaries of the changed and removed
+    recipes and updates the rating cube by their contribution. The single-file copies of
+    the processed data (csv and parquet), which only full runs write, are removed.
+    """
+    for path in [PROCESSED_CSV, PROCESSED_SNAPSHOT]:
+        if os.path.exists(path):
+            os.remove(path)
+
+    _replace_partitions(update["partitions"], PROCESSED_DATASET, update["partition_values"], update["schema"])
+
+    summaries = pd.read_parquet(RECIPE_SUMMARIES)
+    summaries = summaries[~summaries["Recipe_Index"].isin(update["outgoing_recipes"])]
+    if len(update["incoming"]):
+        summaries = pd.concat([summaries, build_recipe_summaries(update["incoming"])], ignore_index=True)
+    if update["complexity"] is not None:
+        summaries["Complexity_Score"] = summaries["Recipe_Index"].map(update["complexity"]).fillna(0)
+    (
+        summaries.sort_values(["Numeric_Index", "Recipe_Index"], kind="stable")
+        .reset_index(drop=True)
+        .to_parquet(RECIPE_SUMMARIES)
+    )
+
+    with np.load(RATING_CUBE) as saved:
+        cube = dict(saved)
+    np.savez(RATING_CUBE, **update_rating_cube(cube, update["outgoing"], update["incoming"], update["ingredients"]))
+
+# Streaming processing
+#
+# For raw files larger than memory. The raw csv is read in chunks of `chunksize` rows
+# and the rows are spilled to `n_buckets` bucket files by a hash of their recipe, so
+# each bucket holds every row of its recipes whatever the row order of the input.
+# Buckets are then processed one at a time: the per-recipe features (categories,
+# ingredient proportion) are computed and the global statistics of the normalizations
+# (recipes per ingredient, min/max unique ingredients per recipe) accumulated. A second
+# pass over the buckets applies the normalizations and appends each bucket to the outputs
+# as it goes: the processed csv, the partitioned parquet dataset (one set of files per
+# bucket), the recipe summaries (one row group per bucket) and the counts of the rating
+# cube. The rating-sorted recipe arrays of the cube are merged from per-bucket sorted
+# runs into memory-mapped files, MERGE_BLOCK entries per run at a time. Peak memory is
+# one chunk or one bucket plus per-ingredient statistics, whatever the size of the input
+# (benchmarks/bench_stream_memory.py checks it).
+
+# raw csv column types, so that every chunk parses the same way
+RAW_DTYPES = {"Ingredient": str, "Text": str, "Recipe_Index": str, "Rating": float, "Quantity": float, "Unit": str}
+
+# target size of a bucket file when the number of buckets is derived from the input size
+BUCKET_BYTES = 64 * 2**20
+
+# number of entries taken from each sorted run at a time when merging the recipe ratings
+MERGE_BLOCK = 65536
+
+def _split_into_buckets(source, bucket_dir: str, n_buckets: int, chunksize: int) -> list:
+    """
+    Spills the raw csv rows to `n_buckets` csv files, by a hash of 'Recipe_Index'.
+    Returns the paths of the non-empty buckets.
+    """
+    paths = [os.path.join(bucket_dir, f"bucket_{i}.csv") for i in range(n_buckets)]
+    written = set()
+    for chunk in pd.read_csv(source, index_col=0, chunksize=chunksize, dtype=RAW_DTYPES):
+        chunk = chunk.dropna(subset=["Recipe_Index", "Ingredient"])
+        buckets = pd.util.hash_pandas_object(chunk["Recipe_Index"], index=False).to_numpy() % n_buckets
+        for bucket, rows in chunk.groupby(buckets):
+            rows.to_csv(paths[bucket], mode="a", header=bucket not in written, index=False)
+            written.add(bucket)
+    return [paths[bucket] for bucket in sorted(written)]
+
+def _merge_sorted_runs(runs: list, ratings_out: np.ndarray, recipes_out: np.ndarray, block: int = MERGE_BLOCK):
+    """
+    Merges rating-sorted runs of (ratings, recipe indexes) arrays (memory-mapped) into
+    `ratings_out` and `recipes_out`, holding at most `block` entries of each run in memory.
+    """
+    positions = [0] * len(runs)
+    last = [None] * len(runs)  # last rating taken from each run
+    pending_ratings = np.empty(0)
+    pending_recipes = np.empty(0, dtype=recipes_out.dtype)
+    written = 0
+    limit = -np.inf
+    while True:
+        # refill the runs whose entries in memory have all been written
+        taken_ratings, taken_recipes = [pending_ratings], [pending_recipes]
+        for i, (ratings, recipes) in enumerate(runs):
+            if positions[i] < len(ratings) and (last[i] is None or last[i] <= limit):
+                stop = min(positions[i] + block, len(ratings))
+                taken_ratings.append(np.asarray(ratings[positions[i]:stop]))
+                taken_recipes.append(np.asarray(recipes[positions[i]:stop], dtype=recipes_out.dtype))
+                positions[i] = stop
+                last[i] = ratings[stop - 1]
+        ratings = np.concatenate(taken_ratings)
+        recipes = np.concatenate(taken_recipes)
+        if not len(ratings):
+            break
+
+        # every entry not read yet is at least the last one read from its run
+        unread = [last[i] for i in range(len(runs)) if positions[i] < len(runs[i][0])]
+        limit = min(unread) if unread else np.inf
+        order = np.argsort(ratings, kind="stable")
+        ratings, recipes = ratings[order], recipes[order]
+        n = np.searchsorted(ratings, limit, side="right")
+
+        ratings_out[written:written + n] = ratings[:n]
+        recipes_out[written:written + n] = recipes[:n]
+        written += n
+        pending_ratings, pending_recipes = ratings[n:], recipes[n:]
+
+def process_stream(source, chunksize: int = 100_000, n_buckets: int = None, step: float = 0.1):
+    """
+    Processes a raw csv (a path or a file object) in bounded memory and saves the same
+    outputs as save_processed_data. The recipe summaries are written bucket by bucket,
+    so their rows are not sorted (the app does not rely on their order).
+
+    Parameters:
+    -----------
+    source : str or file-like
+        The raw csv, with the columns of the data read by read_data.
+    chunksize : int
+        Number of raw rows read at a time.
+    n_buckets : int, optional
+        Number of recipe buckets. Defaults to one per BUCKET_BYTES of input
+        (or 16 when the size of `source` is unknown).
+    step : float
+        The step of the rating slider, for the rating cube.
+
+    Returns:
+    --------
+    int
+        The number of processed rows written.
+    """
+    if n_buckets is None:
+        n_buckets = math.ceil(os.path.getsize(source) / BUCKET_BYTES) if isinstance(source, (str, os.PathLike)) else 16
+    n_buckets = max(1, n_buckets)
+
+    # the ingest and source states of a regular run do not describe this data anymore,
+    # and must be gone before any output is rewritten
+    clear_ingest_state()
+    if os.path.exists(SOURCE_STATE):
+        os.remove(SOURCE_STATE)
+
+    with tempfile.TemporaryDirectory(prefix="cookie-ingest-") as work_dir:
+        buckets = _split_into_buckets(source, work_dir, n_buckets, chunksize)
+
+        # first pass: per-recipe features and global statistics
+        ingredient_counts = Counter()
+        min_size = max_size = None
+        feature_paths = []
+        for bucket in buckets:
+            features = pd.read_csv(bucket, dtype=RAW_DTYPES)
+            features = calculate_ingredient_proportion(engineer_categories_and_subcategories(features))
+
+            pairs = _recipe_ingredient_pairs(features)
+            ingredient_counts.update(pairs["Ingredient"].value_counts().to_dict())
+            sizes = pairs.groupby("Recipe_Index")["Ingredient"].nunique()
+            if len(sizes):
+                min_size = sizes.min() if min_size is None else min(min_size, sizes.min())
+                max_size = sizes.max() if max_size is None else max(max_size, sizes.max())
+
+            feature_path = bucket.replace(".csv", ".parquet")
+            features.to_parquet(feature_path, index=False)
+            feature_paths.append(feature_path)
+            os.remove(bucket)
+
+        popularity = normalize_counts(pd.Series(ingredient_counts, dtype=float))
+        edges = rating_cube_edges(step)
+        ingredients = pd.Index(np.sort(np.asarray(list(ingredient_counts), dtype=object)))
+
+        # second pass: normalizations, then every output appended bucket by bucket
+        counts = sums = None
+        rating_runs = []
+        summaries_writer = snapshot_writer = None
+        schema = None
+        staging = PROCESSED_DATASET + ".tmp"
+        summaries_staging = RECIPE_SUMMARIES + ".tmp"
+        snapshot_staging = PROCESSED_SNAPSHOT + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        n_rows = 0
+        try:
+            for n, feature_path in enumerate(feature_paths):
+                processed = pd.read_parquet(feature_path)
+                os.remove(feature_path)
+                processed["Popularity_Score"] = _map_by_category(processed["Ingredient"], popularity)
+                sizes = _recipe_ingredient_pairs(processed).groupby("Recipe_Index")["Ingredient"].nunique()
+                complexity = (sizes.astype(float) - min_size) / (max_size - min_size)
+                processed["Complexity_Score"] = _map_by_category(processed["Recipe_Index"], complexity)
+                processed.index = pd.RangeIndex(n_rows, n_rows + len(processed))
+
+                processed.to_csv(PROCESSED_CSV, mode="a" if n_rows else "w",
+                                 header=not n_rows)
+
+                # the single-file parquet copy, one row group per bucket
+                snapshot = pa.Table.from_pandas(processed, preserve_index=False)
+                if snapshot_writer is None:
+                    snapshot_writer = pq.ParquetWriter(snapshot_staging, _arrow_schema(snapshot))
+                snapshot_writer.write_table(snapshot.select(snapshot_writer.schema.names).cast(snapshot_writer.schema))
+
+                # one set of files per bucket, all with the schema of the first one
+                schema = write_processed_dataset(processed, staging, f"bucket-{n}-{{i}}.parquet", schema)
+
+                # one row group of summaries per bucket
+                summaries = pa.Table.from_pandas(build_recipe_summaries(processed), preserve_index=False)
+                if summaries_writer is None:
+                    summaries_writer = pq.ParquetWriter(summaries_staging, _arrow_schema(summaries))
+                summaries_writer.write_table(summaries.cast(summaries_writer.schema))
+
+                bucket_counts, bucket_sums, bucket_ratings = count_rating_cube(processed, edges, ingredients)
+                counts = bucket_counts if counts is None else counts + bucket_counts
+                sums = bucket_sums if sums is None else sums + bucket_sums
+
+                # the bucket's recipe ratings, sorted, as a run for the final merge
+                if len(bucket_ratings):
+                    bucket_ratings = bucket_ratings.sort_values(kind="stable")
+                    run_path = os.path.join(work_dir, f"ratings_{n}")
+                    np.save(run_path + ".npy", bucket_ratings.to_numpy(dtype=float))
+                    np.save(run_path + "_recipes.npy", bucket_ratings.index.to_numpy(dtype=str))
+                    rating_runs.append(run_path)
+
+                n_rows += len(processed)
+        finally:
+            for writer in [summaries_writer, snapshot_writer]:
+                if writer is not None:
+                    writer.close()
+
+        if not n_rows:
+            raise ValueError("The raw data has no recipe rows.")
+
+        # rating-sorted recipe arrays of the cube, merged into memory-mapped files
+        runs = [(np.load(path + ".npy", mmap_mode="r"), np.load(path + "_recipes.npy", mmap_mode="r"))
+                for path in rating_runs]
+        n_rated = sum(len(ratings) for ratings, _ in runs)
+        recipe_dtype = max((recipes.dtype for _, recipes in runs), key=lambda dtype: dtype.itemsize,
+                           default=np.dtype(str))
+        sorted_ratings = np.lib.format.open_memmap(os.path.join(work_dir, "sorted_ratings.npy"), mode="w+",
+                                                   dtype=float, shape=(n_rated,))
+        sorted_recipes = np.lib.format.open_memmap(os.path.join(work_dir, "sorted_recipes.npy"), mode="w+",
+                                                   dtype=recipe_dtype, shape=(n_rated,))
+        _merge_sorted_runs(runs, sorted_ratings, sorted_recipes)
+
+        cube = finish_rating_cube(edges, ingredients, counts, sums)
+        np.savez(RATING_CUBE, **cube, sorted_ratings=sorted_ratings, sorted_recipes=sorted_recipes)
+        del runs, sorted_ratings, sorted_recipes
+
+    _publish_dataset(staging, PROCESSED_DATASET)
+    os.replace(summaries_staging, RECIPE_SUMMARIES)
+    os.replace(snapshot_staging, PROCESSED_SNAPSHOT)
+
+    return n_rows
+
+def main(incremental: bool = False, stream=None, source=None, force: bool = False):
+    """
+    Reads in the raw data from the source (the web by default) and saves it to data/raw/raw_cookie_data.csv
+    (unless the source is that file, or a directory holding it).
+    Proccesses the raw data by generating the missing rating values.
+    Engineers new features: ingredient category, ingredient subcategory, 
+    ingredient proportion, ingredient popularity score, and complexity score.
+    Saves the processed data to data/processed/processed_cookie_data.csv and
+    data/processed/processed_cookie_data.parquet, as a parquet dataset partitioned by subcategory, sorted by rating, to data/processed/processed_cookie_data/.
+    Saves one summary row per recipe to data/processed/processed_recipe_summaries.parquet
+    and the rating x ingredient aggregate cube to data/processed/processed_rating_cube.npz.
+
+    Nothing is processed if the source reports no change (conditional request, file
+    times and sizes) or if the content hash of the raw data is the one of the last
+    processed data, unless `force=True` or an output file is missing.
+    With `incremental=True`, only the recipes that changed since the last run are
+    reprocessed and only the outputs they affect are rewritten (see process_incremental
+    and save_incremental); the first run is always a full one, and so is the only one
+    to write the processed csv and parquet file (an incremental run removes them). A run interrupted while
+    writing the outputs is followed by a full run.
+    With `stream` (the path of a raw csv), the file is processed in bounded memory
+    instead (see process_stream).
+    """
+    if stream is not None:
+        n_rows = process_stream(stream)
+        print(f"Processed {n_rows} rows from {stream}.")
+        return
+
+    source = make_source(source)
+    outputs_exist = all(os.path.exists(path) for path in PROCESSED_OUTPUTS)
+    source_state = load_source_state() if outputs_exist and not force else {}
+    if source_state.get("source") != str(source):
+        source_state = {}
+
+    # read data from the source
+    parts, validators = source.fetch(source_state.get("validators"))
+    if parts is None:
+        print(f"{source} has not changed since the last run.")
+        return
+    digest = content_hash(parts)
+    if digest == source_state.get("sha256"):
+        save_source_state({**source_state, "validators": validators})
+        print(f"The data from {source} has not changed since the last run.")
+        return
+    raw_data = parse_raw_data(parts)
+    del parts
+
+    # save raw data to csv, unless that is where it was read from
+    if not _reads_path(source, RAW_COPY):
+        raw_data.to_csv(RAW_COPY)
+
+    state = load_ingest_state() if incremental else None
+    if state is not None and "recipe_partitions" in state and outputs_exist:
+        update, state = process_incremental(raw_data, state)
+        if update is None:
+            print("No recipes changed since the last run.")
+        else:
+            clear_ingest_state()
+            save_incremental(update)
+            save_ingest_state(state)
+    else:
+        processed_data = process_raw_data(raw_data)
+        clear_ingest_state()
+        save_processed_data(processed_data)
+        save_ingest_state(build_ingest_state(raw_data, processed_data))
+
+    # recorded last, so that an interrupted run is redone
+    save_source_state({"source": str(source), "sha256": digest, "validators": validators})
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Read and process the cookie recipe data.")
+    parser.add_argument("--source", metavar="URL_OR_PATH",
+                        help="raw data source: an http(s) URL, a csv file or a directory of csv files "
+                             "(default: the published cookie recipes)")
+    parser.add_argument("--force", action="store_true",
+                        help="process the data even if it has not changed since the last run")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only reprocess the recipes that changed since the last run")
+    parser.add_argument("--stream", metavar="RAW_CSV",
+                        help="process a local raw csv in bounded memory, chunk by chunk")
+    args = parser.parse_args()
+    main(incremental=args.incremental, stream=args.stream, source=args.source, force=args.force)
@@ -0,0 +1,314 @@
+# dataset.py
+#
+# The processed recipe data shared by every callback.
+# The parquet data is read once, on first use, validated against the columns the
+# dashboard relies on, and kept together with the ingredient index built from it.
+# The processed data is a parquet dataset partitioned by subcategory with rating-sorted
+# row groups; read_recipes pushes rating-range, ingredient and subcategory filters
+# down to the reader, so that only the matching partitions and row groups are read.
+#
+# The first process to load the full table also writes it, already compacted, to an
+# uncompressed Arrow IPC file (ARROW_PATH). Every process then memory-maps that file
+# read-only: the numeric columns are views of the mapping, whose pages the OS shares
+# between all the workers, and no worker parses parquet again until the data changes.
+
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .data_reading_and_processing import build_rating_cube, build_recipe_summaries, compact_dtypes
+from .ingredient_index import IngredientIndex
+from .rating_cube import RatingCube
+
+PARQUET_PATH = os.environ.get("COOKIE_DATA_PATH", "data/processed/processed_cookie_data")
+# single-file layout written before the data was partitioned, read if the dataset is missing
+LEGACY_PARQUET_PATH = "data/processed/processed_cookie_data.parquet"
+SUMMARIES_PATH = os.environ.get("COOKIE_SUMMARIES_PATH", "data/processed/processed_recipe_summaries.parquet")
+CUBE_PATH = os.environ.get("COOKIE_CUBE_PATH", "data/processed/processed_rating_cube.npz")
+# memory-mapped copy of the compacted table, shared by the workers (empty to disable)
+ARROW_PATH = os.environ.get("COOKIE_ARROW_PATH", "data/processed/processed_cookie_data.arrow")
+
+# free-text columns that no callback reads; they stay in the parquet file but are not loaded
+UNUSED_COLUMNS = ["Text"]
+
+# columns every callback relies on
+REQUIRED_COLUMNS = [
+    "Recipe_Index", "Ingredient", "Rating", "Quantity", "Unit",
+    "category", "subcategory", "Popularity_Score", "Complexity_Score"
+]
+
+
+class Dataset:
+    """
+    The processed recipe table (one row per recipe ingredient), its ingredient index,
+    the recipe-level summary table and the rating x ingredient aggregate cube.
+
+    Parameters
+    ----------
+    recipes : pd.DataFrame
+        The processed recipe data, already validated.
+    summaries : pd.DataFrame, optional
+        The recipe-level table written by the processing pipeline. Built from
+        `recipes` if not given.
+    cube : RatingCube, optional
+        The aggregate cube written by the processing pipeline. Built from
+        `recipes` if not given.
+    """
+
+    def __init__(self, recipes: pd.DataFrame, summaries: pd.DataFrame = None, cube: RatingCube = None):
+        self.recipes = recipes
+        self.index = IngredientIndex(recipes)
+
+        # ingredient -> popularity score
+        popularity = recipes.groupby("Ingredient", observed=True)["Popularity_Score"].mean()
+        popularity = popularity.astype(float).sort_values(ascending=False, kind="stable")
+        self.popularity = popularity.to_dict()
+
+        # checklist order (popularity high -> low) for every subcategory, and for no subcategory
+        subcategories = (
+            recipes[["Ingredient", "subcategory"]]
+            .dropna()
+            .drop_duplicates("Ingredient")
+            .set_index("Ingredient")["subcategory"]
+        )
+        ranked = pd.Series(popularity.index, index=popularity.index).map(subcategories)
+        self._ingredients_by_subcategory = {
+            subcat: tuple(ingredients.index) for subcat, ingredients in ranked.groupby(ranked, observed=True, sort=False)
+        }
+        self._ingredients_by_subcategory[None] = tuple(popularity.index)
+
+        # one row per recipe (complexity score, formatted ingredients, ...), indexed by recipe code
+        # and kept in display order (by numeric recipe index)
+        if summaries is None or not self.index.recipe_ids.isin(summaries["Recipe_Index"]).all():
+            summaries = build_recipe_summaries(recipes)
+        summaries = summaries.set_index("Recipe_Index").reindex(self.index.recipe_ids)
+        summaries.index.name = "Recipe_Index"
+        self.recipe_table = (
+            summaries.reset_index()
+            .sort_values("Numeric_Index", kind="stable")
+        )
+
+        # rating x ingredient counts / rating sums with cumulative sums along the rating axis
+        n_rated = int(np.count_nonzero(~np.isnan(self.index.recipe_ratings)))
+        if cube is None or len(cube.sorted_recipes) != n_rated or set(cube.ingredients) != set(self.index.ingredients):
+            cube = RatingCube(build_rating_cube(recipes))
+        self.cube = cube
+
+    def ingredients_by_popularity(self, subcategory=None) -> tuple:
+        """
+        Returns the ingredients of a subcategory (all ingredients if `subcategory`
+        is None) ordered by popularity score, high to low.
+        """
+        return self._ingredients_by_subcategory.get(subcategory, ())
+
+    def recipe_ingredients_text(self, recipe_id) -> str:
+        """
+        Returns the formatted ingredient list ("quantity unit ingredient" lines) of one recipe.
+        """
+        code = self.index.recipe_code(recipe_id)
+        if code is None:
+            return ""
+        return self.recipe_table.at[code, "Formatted_Ingredients"]
+
+
+def validate_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Checks that the processed data has the columns the dashboard needs and fills
+    in missing complexity scores.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The processed recipe data.
+
+    Returns
+    -------
+    pd.DataFrame
+        The data with `Complexity_Score` present and free of missing values.
+
+    Raises
+    ------
+    ValueError
+        If any other required column is missing.
+    """
+    # Ensure Complexity_Score exists
+    if "Complexity_Score" not in df.columns:
+        df["Complexity_Score"] = 0  # Default value if missing
+    if df["Complexity_Score"].isna().any():
+        df["Complexity_Score"] = df["Complexity_Score"].fillna(0)  # Replace NaN with 0
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Processed data is missing required columns: {missing}")
+
+    return df
+
+
+def recipe_filter(rating_range=None, ingredients=None, subcategories=None):
+    """
+    Builds the pyarrow filter expression of the given predicates (None if there is none).
+
+    Parameters
+    ----------
+    rating_range : tuple of float, optional
+        Keep the rows rated within [low, high].
+    ingredients : iterable of str, optional
+        Keep the rows of these ingredients.
+    subcategories : iterable of str, optional
+        Keep the rows of these subcategories (whole partitions are skipped).
+    """
+    predicates = []
+    if rating_range is not None:
+        low, high = rating_range
+        predicates.append((ds.field("Rating") >= low) & (ds.field("Rating") <= high))
+    if ingredients:
+        predicates.append(ds.field("Ingredient").isin(list(ingredients)))
+    if subcategories:
+        predicates.append(ds.field("subcategory").isin(list(subcategories)))
+
+    expression = None
+    for predicate in predicates:
+        expression = predicate if expression is None else expression & predicate
+    return expression
+
+
+def read_recipes(path: str = PARQUET_PATH, rating_range=None, ingredients=None, subcategories=None,
+                 columns=None) -> pd.DataFrame:
+    """
+    Reads the processed rows matching the filters (see recipe_filter) from the parquet
+    dataset (or single file) at `path`.
+
+    The filters are evaluated by the parquet reader: partitions whose subcategory is
+    excluded are not opened, and row groups whose rating or ingredient statistics
+    exclude every row are not read. Columns default to all but the unused ones.
+    """
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    if columns is None:
+        columns = [col for col in dataset.schema.names
+                   if col not in UNUSED_COLUMNS and not col.startswith("__index_level_")]
+    table = dataset.to_table(columns=columns, filter=recipe_filter(rating_range, ingredients, subcategories))
+    return table.to_pandas()
+
+
+def source_fingerprint(path: str) -> str:
+    """
+    Returns a fingerprint of the parquet file or dataset directory at `path` (names,
+    sizes and modification times of its files), which changes whenever it is rewritten.
+    """
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    digest = hashlib.sha1()
+    for file in files:
+        stat = os.stat(file)
+        digest.update(f"{os.path.relpath(file, path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def write_arrow(df: pd.DataFrame, arrow_path: str, fingerprint: str):
+    """
+    Writes the compacted table to an uncompressed Arrow IPC file (atomically, so that
+    workers starting at the same time never map a partial file).
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"source": fingerprint.encode()})
+    tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+
+
+def map_arrow(arrow_path: str, fingerprint: str):
+    """
+    Memory-maps the Arrow IPC file read-only. Returns None if it does not exist or was
+    written from other data than `fingerprint`.
+    """
+    if not os.path.exists(arrow_path):
+        return None
+    reader = pa.ipc.open_file(pa.memory_map(arrow_path, "r"))
+    if (reader.schema.metadata or {}).get(b"source") != fingerprint.encode():
+        return None
+    return reader.read_all()
+
+
+def load_shared_recipes(path: str, arrow_path: str = ARROW_PATH) -> pd.DataFrame:
+    """
+    Returns the compacted, validated table backed by the memory-mapped Arrow copy of the
+    parquet data at `path`, writing that copy first if it is missing or stale.
+    Falls back to an in-memory table if the copy cannot be written.
+    """
+    fingerprint = source_fingerprint(path)
+    table = map_arrow(arrow_path, fingerprint)
+    if table is None:
+        df = compact_dtypes(validate_schema(read_recipes(path)))
+        try:
+            write_arrow(df, arrow_path, fingerprint)
+        except OSError:
+            return df
+        table = map_arrow(arrow_path, fingerprint)
+
+    # split_blocks keeps each column in its own block, so the columns without nulls are
+    # zero-copy views of the mapping instead of one consolidated copy
+    return validate_schema(table.to_pandas(split_blocks=True))
+
+
+def load_dataset(path: str = PARQUET_PATH, summaries_path: str = SUMMARIES_PATH, cube_path: str = CUBE_PATH,
+                 rating_range=None, ingredients=None, subcategories=None, arrow_path: str = ARROW_PATH) -> Dataset:
+    """
+    Reads and validates the processed data, falling back to an empty table with
+    the expected columns if the parquet data has not been generated yet.
+
+    Unused free-text columns are skipped and the remaining columns are kept in
+    their compact form (categorical strings, float32 scores). The full table is served
+    from the memory-mapped Arrow copy at `arrow_path` (see load_shared_recipes); the
+    optional filters (see read_recipes) restrict the loaded rows instead, for workers
+    that serve a slice of the data. The recipe summaries and the aggregate cube are read
+    from `summaries_path` and `cube_path`, or rebuilt from the data if those files are missing.
+    """
+    if not os.path.exists(path) and os.path.exists(LEGACY_PARQUET_PATH):
+        path = LEGACY_PARQUET_PATH
+
+    filtered = rating_range is not None or ingredients or subcategories
+    if not os.path.exists(path):
+        df = compact_dtypes(validate_schema(pd.DataFrame(columns=REQUIRED_COLUMNS)))
+    elif arrow_path and not filtered:
+        df = load_shared_recipes(path, arrow_path)
+    else:
+        df = compact_dtypes(validate_schema(read_recipes(path, rating_range, ingredients, subcategories)))
+
+    try:
+        summaries = pd.read_parquet(summaries_path)
+    except FileNotFoundError:
+        summaries = None
+
+    try:
+        cube = RatingCube.load(cube_path)
+    except FileNotFoundError:
+        cube = None
+
+    return Dataset(df, summaries, cube)
+
+
+_dataset = None
+_lock = threading.Lock()
+
+
+def get_dataset() -> Dataset:
+    """
+    Returns the shared dataset, loading it on first use.
+
+    Every caller (in every thread) gets the same object, so callbacks can never
+    read different copies of the data.
+    """
+    global _dataset
+    if _dataset is None:
+        with _lock:
+            if _dataset is None:
+                _dataset = load_dataset()
+    return _dataset
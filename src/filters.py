@@ -0,0 +1,61 @@
+# filters.py
+#
+# Canonical form of the dashboard filter inputs.
+# Inputs that select the same recipes are mapped to the same (hashable) key, so they
+# share one entry in the callback caches: ingredient selections are sorted and
+# de-duplicated, no selection and an empty selection are the same, and rating bounds
+# are snapped to the slider step.
+
+from .ingredient_index import MATCH_ANY, MATCH_MODES
+
+# step of the rating-range slider (components.distribution_recipe_ratings)
+RATING_STEP = 0.1
+
+RATING_MIN = 0.0
+RATING_MAX = 1.0
+
+
+def quantize_rating(value, step: float = RATING_STEP) -> float:
+    """
+    Snaps a rating bound to the nearest slider step (e.g. 0.30000000000000004 -> 0.3).
+    """
+    return round(round(float(value) / step) * step, 10)
+
+
+def canonical_filters(rating_range=None, selected_ingredients=None, match_mode=None) -> tuple:
+    """
+    Returns the canonical (rating_range, selected_ingredients, match_mode) key of the filter inputs.
+
+    Parameters
+    ----------
+    rating_range : list of float, optional
+        The [low, high] value of the rating slider. Defaults to the full range.
+    selected_ingredients : list of str, optional
+        The checked ingredients. None and [] both mean no ingredient filter.
+    match_mode : {"any", "all"}, optional
+        Whether recipes must contain any or all of the selected ingredients.
+
+    Returns
+    -------
+    tuple
+        ((low, high), sorted unique ingredients, match mode). The match mode is
+        "any" whenever fewer than two ingredients are selected, since both modes
+        select the same recipes then.
+
+    Examples
+    --------
+    >>> canonical_filters([0.30000000000000004, 1], ["egg", "butter", "egg"], "all")
+    ((0.3, 1.0), ('butter', 'egg'), 'all')
+    >>> canonical_filters([0, 1], None, "all") == canonical_filters([0, 1], [], "any")
+    True
+    """
+    if not rating_range:
+        rating_range = (RATING_MIN, RATING_MAX)
+    low, high = sorted(quantize_rating(bound) for bound in rating_range)
+
+    ingredients = tuple(sorted(set(selected_ingredients or ())))
+
+    if match_mode not in MATCH_MODES or len(ingredients) < 2:
+        match_mode = MATCH_ANY
+
+    return (low, high), ingredients, match_mode
@@ -0,0 +1,130 @@
+# inflight.py
+#
+# Deduplication of concurrent identical computations, and dropping of superseded
+# callback requests.
+#
+# Dragging the rating slider fires bursts of requests at the callbacks, and after a
+# deploy many users miss the cold cache with the same filters at once.
+# `single_flight` makes concurrent calls of a function with the same arguments share
+# one execution: the first caller computes, the others wait for its result (or its
+# exception) instead of computing it again. This is per process: gunicorn workers
+# still compute a key once each, but write it to the same shared cache. A caller waits
+# at most WAIT_TIMEOUT seconds, then computes the result itself, so a stuck first call
+# does not hold up the others.
+#
+# Every filter change also bumps a sequence number in the browser (the `filter-request`
+# store, see assets/clientside.js), which the filter callbacks receive as their first
+# input. `is_superseded(token)` tells whether a newer request from the same page was
+# already seen; the callbacks then raise PreventUpdate instead of computing, or sending,
+# a result the page would overwrite anyway. The latest sequence number of each page is
+# kept in a small table in shared memory (not in the result cache, and never on disk),
+# created before gunicorn forks its workers, so they see each other's requests; without
+# --preload each worker has its own table. Cancellation is still best-effort: a page
+# whose slot another page took over is not known to be superseded, and a request that
+# is already computing when a newer one arrives only stops at its next check.
+
+import hashlib
+import mmap
+import multiprocessing
+import threading
+from functools import wraps
+
+import numpy as np
+
+from . import metrics
+
+# number of slots of the table of latest sequence numbers (pages hashing to the same slot replace each other)
+MAX_CLIENTS = 10_000
+
+# seconds a caller waits for a concurrent identical call before computing the result itself
+WAIT_TIMEOUT = 30
+
+
+class _Call:
+    """
+    One execution of a single-flight function, shared by the concurrent callers.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def single_flight(func):
+    """
+    Makes concurrent calls of `func` with equal (hashable) arguments wait for the
+    first one and share its result, instead of each running `func`.
+    """
+    lock = threading.Lock()
+    calls = {}
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        with lock:
+            call = calls.get(key)
+            leader = call is None
+            if leader:
+                call = calls[key] = _Call()
+
+        if not leader:
+            with metrics.phase("wait"):
+                finished = call.done.wait(WAIT_TIMEOUT)
+            if not finished:
+                # the first call is stuck or very slow: do not wait for it any longer
+                return func(*args, **kwargs)
+            metrics.shared_result()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with lock:
+                del calls[key]
+            call.done.set()
+
+    return wrapper
+
+
+# one slot per page (picked by a hash of its id): (id hash, highest sequence number seen).
+# The table is an anonymous shared mapping, so the worker processes forked after this
+# module is imported (gunicorn --preload) all read and write the same one.
+_latest = np.frombuffer(mmap.mmap(-1, MAX_CLIENTS * 2 * 8), dtype=np.int64).reshape(MAX_CLIENTS, 2)
+_latest_lock = multiprocessing.Lock()
+
+
+def _client_key(client) -> int:
+    """
+    Returns a non-zero 64-bit hash of a page id, the same in every process (0 marks an empty slot).
+    """
+    digest = hashlib.blake2b(str(client).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+def is_superseded(token) -> bool:
+    """
+    Records the request `token` (the {"client", "seq"} data of the filter-request store)
+    and returns whether a request with a higher sequence number from the same page was
+    already seen, by any worker. Requests without a valid token are never superseded.
+    """
+    if not token or token.get("client") is None:
+        return False
+    seq = token.get("seq")
+    if not isinstance(seq, int) or not 0 <= seq < 2**63:
+        return False
+    key = _client_key(token["client"])
+
+    slot = _latest[key % MAX_CLIENTS]
+    with _latest_lock:
+        # a slot holding another page is taken over: that page is just not known anymore
+        if slot[0] != key or slot[1] < seq:
+            slot[0], slot[1] = key, seq
+            return False
+        return seq < slot[1]
@@ -0,0 +1,174 @@
+# ingredient_index.py
+#
+# Inverted index from ingredient to the recipes that contain it.
+# Each ingredient maps to a bitset over recipes (one bit per recipe, packed
+# into uint64 words), so filtering by a set of ingredients is a handful of
+# word-wise OR / AND operations instead of a scan over every ingredient row.
+
+import numpy as np
+import pandas as pd
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+MATCH_MODES = (MATCH_ANY, MATCH_ALL)
+
+
+def _pack(mask: np.ndarray, n_words: int) -> np.ndarray:
+    """
+    Packs a boolean mask over recipes into a bitset of `n_words` uint64 words.
+    """
+    packed = np.packbits(mask, bitorder="little")
+    padded = np.zeros(n_words * 8, dtype=np.uint8)
+    padded[:packed.size] = packed
+    return padded.view("<u8")
+
+
+class IngredientIndex:
+    """
+    Ingredient -> recipe bitset index built once from the long-format recipe table.
+
+    Recipes are numbered by their position in `recipe_ids`; bit `r` of a bitset
+    is set when recipe `r` is in the set.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The processed recipe data with one row per (recipe, ingredient), holding
+        at least the `Recipe_Index`, `Ingredient` and `Rating` columns.
+
+    Examples
+    --------
+    >>> index = IngredientIndex(df)
+    >>> bits = index.match(["egg", "butter"], mode="all") & index.rating_range(0.5, 1)
+    >>> index.recipes(bits)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        # factorizing categorical columns works on their codes; the (small) uniques are kept as plain strings
+        recipe_codes, recipe_ids = pd.factorize(df["Recipe_Index"], sort=True)
+        ingredient_codes, ingredients = pd.factorize(df["Ingredient"], sort=True)
+        self.recipe_ids = pd.Index(np.asarray(recipe_ids, dtype=object))
+        self.ingredients = pd.Index(np.asarray(ingredients, dtype=object))
+
+        self.n_recipes = len(self.recipe_ids)
+        self.n_words = max((self.n_recipes + 63) // 64, 1)
+        self._ingredient_codes = {ing: code for code, ing in enumerate(self.ingredients)}
+        self._recipe_codes = {rid: code for code, rid in enumerate(self.recipe_ids)}
+
+        # one rating per recipe (every ingredient row of a recipe carries the same rating)
+        self.recipe_ratings = (
+            pd.Series(df["Rating"].to_numpy(dtype=float), index=recipe_codes)
+            .groupby(level=0).mean()
+            .reindex(range(self.n_recipes))
+            .to_numpy()
+        )
+
+        # set bit (recipe) in row (ingredient) for every ingredient row with both values present
+        valid = (recipe_codes >= 0) & (ingredient_codes >= 0)
+        recipe_codes = recipe_codes[valid].astype(np.uint64)
+        ingredient_codes = ingredient_codes[valid]
+        self._bits = np.zeros((len(self.ingredients), self.n_words), dtype=np.uint64)
+        np.bitwise_or.at(
+            self._bits,
+            (ingredient_codes, (recipe_codes >> np.uint64(6)).astype(np.intp)),
+            np.left_shift(np.uint64(1), recipe_codes & np.uint64(63))
+        )
+
+        self._all = _pack(np.ones(self.n_recipes, dtype=bool), self.n_words)
+        self._none = np.zeros(self.n_words, dtype=np.uint64)
+
+    def all_recipes(self) -> np.ndarray:
+        """
+        Returns the bitset containing every recipe.
+        """
+        return self._all.copy()
+
+    def _codes(self, ingredients) -> list:
+        return [self._ingredient_codes[ing] for ing in ingredients if ing in self._ingredient_codes]
+
+    def match(self, ingredients, mode: str = MATCH_ANY) -> np.ndarray:
+        """
+        Returns the bitset of recipes matching the selected ingredients.
+
+        Parameters
+        ----------
+        ingredients : iterable of str
+            The selected ingredients. An empty selection matches every recipe.
+        mode : {"any", "all"}
+            "any" returns recipes containing at least one selected ingredient
+            (bitset union), "all" returns recipes containing every selected
+            ingredient (bitset intersection).
+
+        Returns
+        -------
+        np.ndarray
+            A uint64 bitset over recipes.
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"mode must be one of {MATCH_MODES}, got {mode!r}")
+
+        ingredients = list(ingredients or [])
+        if not ingredients:
+            return self.all_recipes()
+
+        codes = self._codes(ingredients)
+        if mode == MATCH_ALL:
+            # an ingredient that appears in no recipe empties the intersection
+            if len(set(codes)) < len(set(ingredients)):
+                return self._none.copy()
+            return np.bitwise_and.reduce(self._bits[codes], axis=0)
+
+        if not codes:
+            return self._none.copy()
+        return np.bitwise_or.reduce(self._bits[codes], axis=0)
+
+    def rating_range(self, low: float, high: float) -> np.ndarray:
+        """
+        Returns the bitset of recipes whose rating lies within [low, high].
+        """
+        mask = (self.recipe_ratings >= low) & (self.recipe_ratings <= high)
+        return _pack(mask, self.n_words)
+
+    def mask(self, bits: np.ndarray) -> np.ndarray:
+        """
+        Unpacks a bitset into a boolean mask with one entry per recipe.
+        """
+        return np.unpackbits(bits.view(np.uint8), bitorder="little", count=self.n_recipes).astype(bool)
+
+    def recipes(self, bits: np.ndarray) -> np.ndarray:
+        """
+        Returns the `Recipe_Index` values of the recipes in a bitset.
+        """
+        return np.asarray(self.recipe_ids)[self.mask(bits)]
+
+    def recipe_code(self, recipe_id):
+        """
+        Returns the position of a recipe in `recipe_ids` (its bit number), or None if unknown.
+        """
+        return self._recipe_codes.get(recipe_id)
+
+    def ingredient_counts(self, bits: np.ndarray, ingredients=None) -> pd.Series:
+        """
+        Counts, for each ingredient, how many recipes of a bitset contain it.
+
+        Parameters
+        ----------
+        bits : np.ndarray
+            The recipe bitset to count within.
+        ingredients : iterable of str, optional
+            Restrict the counts to these ingredients. Defaults to all ingredients.
+
+        Returns
+        -------
+        pd.Series
+            Recipe counts indexed by ingredient, omitting ingredients with no recipes.
+        """
+        if ingredients:
+            codes = sorted(set(self._codes(ingredients)))
+        else:
+            codes = list(range(len(self.ingredients)))
+
+        counts = np.bitwise_count(self._bits[codes] & bits).sum(axis=1, dtype=np.int64)
+        counts = pd.Series(counts, index=self.ingredients[codes], name="Recipe_Count")
+        counts.index.name = "Ingredient"
+        return counts[counts > 0]
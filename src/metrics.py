@@ -0,0 +1,224 @@
+# metrics.py
+#
+# Per-callback metrics of the Dash server, exposed in the Prometheus text format on
+# /metrics, and a Server-Timing header on every callback response.
+#
+# Each /_dash-update-component request is attributed to the callback that serves it.
+# The callback records how long its phases take (`with phase("filter"): ...`) and
+# whether its memoized result came from the shared cache (`cache_lookup()` before the
+# memoized call, `cache_miss()` inside it, or "shared" when it waited for a concurrent
+# identical call, see inflight.py). Whatever is left of the request time is
+# reported as "serialize" (Dash dispatch and JSON encoding of the response).
+#
+# The metrics are kept per process: with several gunicorn workers, each scrape sees
+# the worker that answered it (the `pid` label tells them apart).
+
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import flask
+
+CALLBACK_PATH = "_dash-update-component"
+
+# histogram buckets (upper bounds) of the request latency, in seconds, and of the response size, in bytes
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+SIZE_BUCKETS = [1e3, 1e4, 1e5, 1e6, 1e7]
+
+
+class Histogram:
+    """
+    Cumulative Prometheus histogram (bucket counts, sum and count) of one series.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip([f"{bound:g}" for bound in self.buckets] + ["+Inf"], self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6g}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class CallbackMetrics:
+    """
+    Request counts, latency and response size histograms, cache results and phase
+    durations, per callback.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.response_bytes = defaultdict(lambda: Histogram(SIZE_BUCKETS))
+        self.cache = defaultdict(int)           # (callback, "hit" / "miss" / "shared") -> count
+        self.phase_seconds = defaultdict(float)  # (callback, phase) -> total seconds
+
+    def record(self, callback, seconds, size, phases, cache_result):
+        with self._lock:
+            self.requests[callback] += 1
+            self.latency[callback].observe(seconds)
+            self.response_bytes[callback].observe(size)
+            for name, duration in phases.items():
+                self.phase_seconds[callback, name] += duration
+            if cache_result is not None:
+                self.cache[callback, cache_result] += 1
+
+    def exposition(self, cache_stats=None) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        pid = f'pid="{os.getpid()}"'
+        lines = []
+        with self._lock:
+            lines += ["# HELP cookie_callback_requests_total Callback requests served.",
+                      "# TYPE cookie_callback_requests_total counter"]
+            lines += [f'cookie_callback_requests_total{{{pid},callback="{cb}"}} {n}'
+                      for cb, n in sorted(self.requests.items())]
+
+            lines += ["# HELP cookie_callback_latency_seconds Callback request latency.",
+                      "# TYPE cookie_callback_latency_seconds histogram"]
+            for cb, histogram in sorted(self.latency.items()):
+                lines += histogram.lines("cookie_callback_latency_seconds", f'{pid},callback="{cb}"')
+
+            lines += ["# HELP cookie_callback_response_bytes Serialized callback response size.",
+                      "# TYPE cookie_callback_response_bytes histogram"]
+            for cb, histogram in sorted(self.response_bytes.items()):
+                lines += histogram.lines("cookie_callback_response_bytes", f'{pid},callback="{cb}"')
+
+            lines += ["# HELP cookie_callback_cache_total Memoized callback results served from the cache (hit), computed (miss) or shared with a concurrent call (shared).",
+                      "# TYPE cookie_callback_cache_total counter"]
+            lines += [f'cookie_callback_cache_total{{{pid},callback="{cb}",result="{result}"}} {n}'
+                      for (cb, result), n in sorted(self.cache.items())]
+
+            lines += ["# HELP cookie_callback_phase_seconds_total Time spent per callback phase.",
+                      "# TYPE cookie_callback_phase_seconds_total counter"]
+            lines += [f'cookie_callback_phase_seconds_total{{{pid},callback="{cb}",phase="{name}"}} {s:.6g}'
+                      for (cb, name), s in sorted(self.phase_seconds.items())]
+
+        if cache_stats:
+            lines += ["# HELP cookie_cache_stat Counters and sizes of the two-tier callback cache.",
+                      "# TYPE cookie_cache_stat gauge"]
+            lines += [f'cookie_cache_stat{{{pid},stat="{name}"}} {value}'
+                      for name, value in sorted(cache_stats.items())]
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = CallbackMetrics()
+
+
+# recording, from inside the callbacks (no-ops outside of a callback request)
+
+def _timing():
+    if not flask.has_request_context():
+        return None
+    return flask.g.get("callback_timing")
+
+
+@contextmanager
+def phase(name):
+    """
+    Times the enclosed block as phase `name` of the current callback request.
+    """
+    timing = _timing()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing["phases"][name] = timing["phases"].get(name, 0.0) + time.perf_counter() - start
+
+
+def cache_lookup():
+    """
+    Marks the start of a memoized call: it counts as a hit unless `cache_miss()` is called.
+    """
+    timing = _timing()
+    if timing is not None:
+        timing["cache"] = "hit"
+
+
+def cache_miss():
+    """
+    Called from the body of a memoized function, which only runs when its result was not cached.
+    """
+    timing = _timing()
+    if timing is not None:
+        timing["cache"] = "miss"
+
+
+def shared_result():
+    """
+    Called when a memoized call reused the result of a concurrent identical call (see inflight.py).
+    """
+    timing = _timing()
+    if timing is not None and timing["cache"] is not None:
+        timing["cache"] = "shared"
+
+
+# request hooks
+
+def _callback_name(dash_app, body):
+    entry = dash_app.callback_map.get(body.get("output")) if body else None
+    callback = entry.get("callback") if entry else None
+    return getattr(callback, "__name__", None) or "unknown"
+
+
+def init_app(dash_app, cache=None):
+    """
+    Instruments the Flask server of `dash_app`: times the callback requests, adds their
+    Server-Timing header and serves /metrics (including the stats of `cache`, if it has any).
+    """
+    server = dash_app.server
+    prefix = dash_app.config.routes_pathname_prefix
+
+    @server.before_request
+    def start_timing():
+        if flask.request.path == prefix + CALLBACK_PATH:
+            flask.g.callback_timing = {"start": time.perf_counter(), "phases": {}, "cache": None}
+
+    @server.after_request
+    def finish_timing(response):
+        timing = flask.g.pop("callback_timing", None)
+        if timing is None:
+            return response
+
+        total = time.perf_counter() - timing["start"]
+        phases = timing["phases"]
+        phases["serialize"] = max(total - sum(phases.values()), 0.0)
+        callback = _callback_name(dash_app, flask.request.get_json(silent=True))
+
+        metrics.record(callback, total, response.calculate_content_length() or 0, phases, timing["cache"])
+
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in phases.items()]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        if timing["cache"] is not None:
+            entries.append(f'cache;desc="{timing["cache"]}"')
+        response.headers["Server-Timing"] = ", ".join(entries)
+        return response
+
+    def metrics_view():
+        backend = getattr(cache, "cache", None)
+        cache_stats = backend.stats() if hasattr(backend, "stats") else None
+        return flask.Response(metrics.exposition(cache_stats), mimetype="text/plain; version=0.0.4")
+
+    server.add_url_rule(prefix + "metrics", "metrics", metrics_view)
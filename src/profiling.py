@@ -0,0 +1,172 @@
+# profiling.py
+#
+# Opt-in profiling of the Dash callbacks, to capture the slow filter combinations
+# as they happen in production.
+#
+# PROFILE_CALLBACKS=1 profiles every callback execution; with PROFILE_ADMIN_TOKEN set,
+# only the requests carrying the header `X-Profile: <token>` are profiled. Each profile
+# (cProfile, readable with pstats or snakeviz) is written to PROFILE_DIR, named after
+# the callback and a hash of its inputs, next to a .json file with the inputs and the
+# duration; only the newest PROFILE_MAX_FILES (default 500) profiles are kept. With
+# PROFILE_ADMIN_TOKEN set, /profiles lists the most recent ones to the requests
+# carrying the same header; without a token the route is not added at all (the
+# profiles are only on the worker's disk), so they are never public.
+#
+# When neither variable is set, `profiled` returns the callbacks unchanged and no
+# route is added, so profiling costs nothing.
+
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import time
+from functools import wraps
+from urllib.parse import quote
+
+import flask
+from markupsafe import escape
+
+PROFILE_ALL = bool(os.environ.get("PROFILE_CALLBACKS"))
+ADMIN_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/cookie-dash-profiles")
+
+PROFILE_HEADER = "X-Profile"
+
+# number of profiles listed on /profiles
+INDEX_SIZE = 50
+
+# number of profiles kept in PROFILE_DIR (the oldest ones are deleted)
+MAX_PROFILES = int(os.environ.get("PROFILE_MAX_FILES", 500))
+
+ENABLED = PROFILE_ALL or bool(ADMIN_TOKEN)
+
+
+def _is_admin() -> bool:
+    """
+    Returns whether the current request carries the admin token in the PROFILE_HEADER header.
+    """
+    if not ADMIN_TOKEN or not flask.has_request_context():
+        return False
+    supplied = flask.request.headers.get(PROFILE_HEADER) or ""
+    return hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+
+def _write_profile(profiler, name, args, kwargs, seconds):
+    inputs = json.dumps({"args": args, "kwargs": kwargs}, default=repr, sort_keys=True)
+    key = hashlib.sha1(inputs.encode()).hexdigest()[:12]
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{key}"
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, stem + ".prof"))
+    with open(os.path.join(PROFILE_DIR, stem + ".json"), "w") as f:
+        json.dump({"callback": name, "inputs": json.loads(inputs), "seconds": seconds, "pid": os.getpid()}, f)
+    _prune_profiles()
+
+
+def _prune_profiles(keep: int = MAX_PROFILES):
+    """
+    Deletes all but the `keep` most recent profiles (their .prof and .json files).
+    """
+    try:
+        stems = sorted({os.path.splitext(name)[0] for name in os.listdir(PROFILE_DIR)
+                        if name.endswith((".prof", ".json"))}, reverse=True)
+    except FileNotFoundError:
+        return
+    for stem in stems[keep:]:
+        for extension in [".prof", ".json"]:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + extension))
+            except FileNotFoundError:
+                # already pruned by another worker
+                pass
+
+
+def profiled(func):
+    """
+    Profiles the executions of a callback when profiling is on (see the module comment).
+    Returns `func` itself when profiling is disabled.
+    """
+    if not ENABLED:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not (PROFILE_ALL or _is_admin()):
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            _write_profile(profiler, func.__name__, args, kwargs, time.perf_counter() - start)
+
+    return wrapper
+
+
+def recent_profiles(limit: int = INDEX_SIZE) -> list:
+    """
+    Returns the metadata of the most recent profiles, newest first.
+    """
+    try:
+        names = sorted((name for name in os.listdir(PROFILE_DIR) if name.endswith(".json")), reverse=True)
+    except FileNotFoundError:
+        return []
+
+    profiles = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                profiles.append({"name": name[:-len(".json")], **json.load(f)})
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def init_app(dash_app):
+    """
+    Adds the /profiles index (and /profiles/<name> for one profile) to the server of
+    `dash_app`, for the admin requests only. Nothing is added without an admin token.
+    """
+    if not ADMIN_TOKEN:
+        return
+    server = dash_app.server
+    prefix = dash_app.config.routes_pathname_prefix + "profiles"
+
+    def check_access():
+        if not _is_admin():
+            flask.abort(403)
+
+    def index():
+        check_access()
+        rows = "".join(
+            f"<tr><td><a href='{escape(prefix + '/' + quote(p['name']))}'>{escape(p['name'])}</a> "
+            f"(<a href='{escape(prefix + '/' + quote(p['name']))}?download'>.prof</a>)</td>"
+            f"<td>{escape(p['callback'])}</td><td>{p['seconds'] * 1000:.1f}</td>"
+            f"<td><code>{escape(json.dumps(p['inputs']))}</code></td></tr>"
+            for p in recent_profiles()
+        )
+        return (
+            "<h1>Recent callback profiles</h1>"
+            "<table><tr><th>profile</th><th>callback</th><th>ms</th><th>inputs</th></tr>"
+            f"{rows}</table>"
+        )
+
+    def profile(name):
+        check_access()
+        path = os.path.join(PROFILE_DIR, os.path.basename(name) + ".prof")
+        if not os.path.exists(path):
+            flask.abort(404)
+        if "download" in flask.request.args:
+            return flask.send_file(path, as_attachment=True)
+
+        # top functions by cumulative time
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(40)
+        return flask.Response(out.getvalue(), mimetype="text/plain")
+
+    server.add_url_rule(prefix, "profiles", index)
+    server.add_url_rule(prefix + "/<name>", "profile", profile)
@@ -0,0 +1,106 @@
+# rating_cube.py
+#
+# Answers rating-range queries from the precomputed rating x ingredient aggregate cube
+# (see data_reading_and_processing.build_rating_cube).
+# Counts and rating sums inside a slider range are a difference of two cumulative rows,
+# and the ratings inside any range are a slice of the rating-sorted recipe array.
+
+import numpy as np
+import pandas as pd
+
+CUBE_ARRAYS = ["edges", "ingredients", "cum_counts", "cum_sums", "sorted_ratings", "sorted_recipes"]
+
+
+class RatingCube:
+    """
+    Rating-range queries over the recipes, in O(ingredients) or O(log recipes).
+
+    Parameters
+    ----------
+    cube : dict of np.ndarray
+        The arrays returned by `build_rating_cube` (or loaded from its .npz file).
+    """
+
+    def __init__(self, cube):
+        self.edges = np.asarray(cube["edges"], dtype=float)
+        self.ingredients = pd.Index(np.asarray(cube["ingredients"], dtype=object))
+        self.cum_counts = np.asarray(cube["cum_counts"])
+        self.cum_sums = np.asarray(cube["cum_sums"])
+        self.sorted_ratings = np.asarray(cube["sorted_ratings"], dtype=float)
+        self.sorted_recipes = np.asarray(cube["sorted_recipes"], dtype=object)
+
+        self._edge_positions = {round(float(edge), 10): pos for pos, edge in enumerate(self.edges)}
+        self._ingredient_codes = {ing: code for code, ing in enumerate(self.ingredients)}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a cube saved with `np.savez(path, **build_rating_cube(df))`.
+        """
+        with np.load(path) as arrays:
+            return cls({name: arrays[name] for name in CUBE_ARRAYS})
+
+    def _rows(self, low, high):
+        """
+        Returns the cumulative rows bounding [low, high], or None if a bound is not a slider position.
+        """
+        a = self._edge_positions.get(round(float(low), 10))
+        b = self._edge_positions.get(round(float(high), 10))
+        if a is None or b is None or a > b:
+            return None
+        return 2 * a + 1, 2 * b + 2
+
+    def covers(self, low, high) -> bool:
+        """
+        Returns whether [low, high] can be answered from the cube (both bounds are slider positions).
+        """
+        return self._rows(low, high) is not None
+
+    def mean_rating(self, low, high) -> float:
+        """
+        Returns the average rating of the recipes rated within [low, high] (0 if there are none).
+        """
+        start, stop = self._rows(low, high)
+        count = self.cum_counts[stop, -1] - self.cum_counts[start, -1]
+        total = self.cum_sums[stop, -1] - self.cum_sums[start, -1]
+        return float(total / count) if count else 0
+
+    def ingredient_counts(self, low, high, ingredients=None) -> pd.Series:
+        """
+        Counts, for each ingredient, the recipes rated within [low, high] that contain it.
+
+        Parameters
+        ----------
+        low, high : float
+            The rating range (slider positions).
+        ingredients : iterable of str, optional
+            Restrict the counts to these ingredients. Defaults to all ingredients.
+
+        Returns
+        -------
+        pd.Series
+            Recipe counts indexed by ingredient (in alphabetical order), omitting
+            ingredients with no recipes.
+        """
+        start, stop = self._rows(low, high)
+        if ingredients:
+            codes = sorted({self._ingredient_codes[ing] for ing in ingredients if ing in self._ingredient_codes})
+        else:
+            codes = list(range(len(self.ingredients)))
+
+        counts = self.cum_counts[stop, codes] - self.cum_counts[start, codes]
+        counts = pd.Series(counts.astype(np.int64), index=self.ingredients[codes], name="Recipe_Count")
+        counts.index.name = "Ingredient"
+        return counts[counts > 0]
+
+    def ratings_between(self, low, high) -> pd.DataFrame:
+        """
+        Returns the recipes rated within [low, high] (any bounds) and their ratings,
+        found by binary search in the rating-sorted recipe array.
+        """
+        start = np.searchsorted(self.sorted_ratings, low, side="left")
+        stop = np.searchsorted(self.sorted_ratings, high, side="right")
+        return pd.DataFrame({
+            "Recipe_Index": self.sorted_recipes[start:stop],
+            "Rating": self.sorted_ratings[start:stop]
+        })
@@ -0,0 +1,235 @@
+# tiered_cache.py
+#
+# Two-tier cache backend for flask_caching: a per-worker in-memory LRU in front
+# of a shared filesystem cache.
+# Hot keys are answered from memory without any pickling or disk I/O; the disk tier
+# is shared by all workers and capped both in number of entries and in bytes. The
+# size of the directory is measured after every write (a count kept in one worker would
+# miss the writes of the others), so the byte cap holds for all workers together.
+
+import os
+import pickle
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.filesystemcache import FileSystemCache
+
+# file names written by FileSystemCache (md5 hex digests of the keys); nothing else is ever pruned
+_CACHE_FILE = re.compile(r"^[0-9a-f]{32}$")
+
+# what the filesystem tier stores: the value and its absolute expiry time (0 for never),
+# so that a value promoted back into memory keeps the expiry it was written with
+_DiskEntry = namedtuple("_DiskEntry", ["expires", "value"])
+
+
+class TieredCache(BaseCache):
+    """
+    In-memory LRU (per worker) backed by a size-capped filesystem cache (shared).
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the filesystem tier. Use a directory dedicated to this cache:
+        pruning deletes its oldest cache files.
+    default_timeout : int
+        Time to live of an entry in seconds (0 means entries never expire).
+    memory_max_entries : int
+        Maximum number of entries kept in memory.
+    memory_max_bytes : int
+        Maximum total (pickled) size of the entries kept in memory.
+    disk_threshold : int
+        Maximum number of entries in the filesystem tier.
+    disk_max_bytes : int
+        Maximum total size of the files in the filesystem tier.
+    """
+
+    def __init__(self, cache_dir, default_timeout=300, memory_max_entries=256,
+                 memory_max_bytes=64 * 2**20, disk_threshold=500, disk_max_bytes=256 * 2**20):
+        super().__init__(default_timeout=default_timeout)
+        self.memory_max_entries = memory_max_entries
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (expires, size, value), least recently used first
+        self._memory_bytes = 0
+        self._counters = Counter()
+
+        self._disk = FileSystemCache(cache_dir, threshold=disk_threshold, default_timeout=default_timeout)
+        self._cache_dir = cache_dir
+        self._disk_bytes = self._disk_usage()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        limits = dict(
+            memory_max_entries=config.get("CACHE_MEMORY_MAX_ENTRIES"),
+            memory_max_bytes=config.get("CACHE_MEMORY_MAX_BYTES"),
+            disk_threshold=config.get("CACHE_THRESHOLD"),
+            disk_max_bytes=config.get("CACHE_DISK_MAX_BYTES"),
+        )
+        kwargs.update({name: limit for name, limit in limits.items() if limit is not None})
+        return cls(config["CACHE_DIR"], *args, **kwargs)
+
+    # memory tier
+
+    def _forget(self, key):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    def _remember(self, key, value, size, expires):
+        with self._lock:
+            # an overwritten entry gives its bytes back first (and is dropped even if the new value does not fit)
+            self._forget(key)
+            if size > self.memory_max_bytes:
+                return
+            self._memory[key] = (expires, size, value)
+            self._memory_bytes += size
+            while len(self._memory) > self.memory_max_entries or self._memory_bytes > self.memory_max_bytes:
+                _, (_, old_size, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= old_size
+                self._counters["memory_evictions"] += 1
+
+    def _recall(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                self._counters["memory_misses"] += 1
+                return None
+            expires, _, value = entry
+            if expires and expires <= time.time():
+                self._forget(key)
+                self._counters["memory_expirations"] += 1
+                self._counters["memory_misses"] += 1
+                return None
+            self._memory.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            return value
+
+    # disk tier
+
+    def _cache_files(self):
+        try:
+            with os.scandir(self._cache_dir) as entries:
+                return [entry for entry in entries if entry.is_file() and _CACHE_FILE.match(entry.name)]
+        except FileNotFoundError:
+            return []
+
+    def _disk_usage(self):
+        return sum(entry.stat().st_size for entry in self._cache_files())
+
+    def _disk_file_size(self, key):
+        try:
+            return os.path.getsize(self._disk._get_filename(key))
+        except OSError:
+            return 0
+
+    def _delete_from_disk(self, key):
+        size = self._disk_file_size(key)
+        result = self._disk.delete(key)
+        with self._lock:
+            self._disk_bytes -= size
+        return result
+
+    def _write_to_disk(self, key, value, expires, timeout):
+        result = self._disk.set(key, _DiskEntry(expires, value), timeout=timeout)
+        # measured, not tracked: the other workers write to the same directory
+        disk_bytes = self._disk_usage()
+        with self._lock:
+            self._disk_bytes = disk_bytes
+        if disk_bytes > self.disk_max_bytes:
+            self._prune_disk()
+        return result
+
+    def _prune_disk(self):
+        """
+        Deletes the oldest cache files until the disk tier is below 80% of its byte limit.
+        """
+        files = sorted(self._cache_files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        for entry in files:
+            if total <= 0.8 * self.disk_max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self._counters["disk_evictions"] += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    # cache interface
+
+    def get(self, key):
+        value = self._recall(key)
+        if value is not None:
+            return value
+
+        entry = self._disk.get(key)
+        if not isinstance(entry, _DiskEntry):
+            # missing, or written before expiry times were stored along with the values
+            with self._lock:
+                self._counters["disk_misses"] += 1
+            return None
+        with self._lock:
+            self._counters["disk_hits"] += 1
+        # promoted with the expiry it has on disk, not a fresh timeout
+        self._remember(key, entry.value, len(pickle.dumps(entry.value, pickle.HIGHEST_PROTOCOL)), entry.expires)
+        return entry.value
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        expires = time.time() + timeout if timeout else 0
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        self._remember(key, value, size, expires)
+
+        if size > self.disk_max_bytes:
+            self._delete_from_disk(key)
+            return True
+        return self._write_to_disk(key, value, expires, timeout)
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout=timeout)
+
+    def delete(self, key):
+        with self._lock:
+            self._forget(key)
+        return self._delete_from_disk(key)
+
+    def has(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and (not entry[0] or entry[0] > time.time()):
+                return True
+        return self._disk.has(key)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        result = self._disk.clear()
+        disk_bytes = self._disk_usage()
+        with self._lock:
+            self._disk_bytes = disk_bytes
+        return result
+
+    def stats(self) -> dict:
+        """
+        Returns the hit / miss / eviction counters of both tiers and their current sizes.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(
+                memory_entries=len(self._memory),
+                memory_bytes=self._memory_bytes,
+                disk_bytes=self._disk_bytes,
+            )
+        return stats
@@ -0,0 +1,113 @@
+# warmup.py
+#
+# Precomputes the dashboard charts and the first page of the recipe list into the
+# shared (disk) cache so that the first users after a deploy, on any worker, do not
+# pay cold-cache cost.
+# Every rating-slider range is warmed with no ingredient selection and, optionally,
+# with each of the N most popular single ingredients.
+#
+# Usage from the project root (before the app workers take traffic):
+# python -m src.warmup --top-n 10 --workers 4
+#
+# Or set CACHE_WARMUP=1 (and optionally CACHE_WARMUP_TOP_N / CACHE_WARMUP_WORKERS)
+# when starting the app; with gunicorn use --preload so it runs once, in the master.
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .filters import RATING_MAX, RATING_MIN, RATING_STEP, canonical_filters
+
+
+def slider_ranges() -> list:
+    """
+    Returns every [low, high] range the rating slider can produce (66 for a 0.1 step on [0, 1]).
+    """
+    n_steps = round((RATING_MAX - RATING_MIN) / RATING_STEP)
+    positions = [RATING_MIN + i * RATING_STEP for i in range(n_steps + 1)]
+    return [[low, high] for i, low in enumerate(positions) for high in positions[i:]]
+
+
+def warmup_keys(top_n: int = 0) -> list:
+    """
+    Returns the canonical filter keys to precompute: every slider range with no
+    ingredient selection, then every slider range for each of the `top_n` most
+    popular ingredients on its own.
+    """
+    from .dataset import get_dataset
+
+    selections = [[]] + [[ing] for ing in get_dataset().ingredients_by_popularity()[:top_n]]
+    return [
+        canonical_filters(rating_range, selection)
+        for selection in selections
+        for rating_range in slider_ranges()
+    ]
+
+
+def warm(keys) -> int:
+    """
+    Computes the dashboard chart updates and the first recipe-list page for each key
+    through the memoized functions, which write them into the cache. Returns the number
+    of keys warmed.
+    """
+    from .app import get_app
+    from .callbacks import dashboard_updates, recipe_page
+
+    with get_app().server.app_context():
+        for key in keys:
+            dashboard_updates(*key)
+            recipe_page(*key, 1)
+    return len(keys)
+
+
+def _init_worker():
+    # a pool process builds its own app when it is spawned rather than forked (the macOS
+    # default): that app must not start another warm-up with another pool
+    os.environ.pop("CACHE_WARMUP", None)
+
+
+def run_warmup(top_n: int = 0, workers: int = None) -> int:
+    """
+    Warms the cache for every slider range (and the top-N single ingredients),
+    spreading the keys over `workers` processes (default: one per core).
+
+    Returns
+    -------
+    int
+        The number of keys warmed.
+    """
+    keys = warmup_keys(top_n)
+    if not keys:
+        return 0
+
+    # The first key is rendered here so that the memoize versions of the functions are
+    # stored in the shared cache before the worker processes start writing entries.
+    warmed = warm(keys[:1])
+    keys = keys[1:]
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(keys) <= 1:
+        return warmed + warm(keys)
+
+    chunks = [keys[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        warmed += sum(pool.map(warm, chunks))
+    return warmed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the dashboard charts and recipe list into the shared cache.")
+    parser.add_argument("--top-n", type=int, default=0,
+                        help="also warm every slider range for the N most popular single ingredients")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of processes to use (default: one per core)")
+    args = parser.parse_args()
+
+    # this is the warm-up: the app it builds must not run one as well
+    os.environ.pop("CACHE_WARMUP", None)
+    warmed = run_warmup(top_n=args.top_n, workers=args.workers)
+    print(f"Warmed {warmed} filter keys.")
+
+
+if __name__ == "__main__":
+    main()
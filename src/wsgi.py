@@ -0,0 +1,8 @@
+# wsgi.py
+#
+# WSGI entry point: `gunicorn src.wsgi:server` (see gunicorn.conf.py). Importing this
+# module builds the app of the process (see app.get_app).
+
+from .app import get_app
+
+server = get_app().server